@@ -0,0 +1,48 @@
+"""Cost of the SENSOR_FILTERS filters on native-rate channels of growing length.
+
+    uv run benchmarks/bench_filters.py --rows 1e6 2e6 4e6 8e6
+
+A flat ns/sample column across sizes means the filter scales linearly.
+"""
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ApplyFilter
+
+SAMPLE_RATE_HZ = 2000.0
+
+FILTERS = [
+    {"kind": "rolling_mean", "window_s": 0.05},
+    {"kind": "rolling_median", "window_s": 0.01},
+    {"kind": "lowpass", "cutoff_hz": 20},
+    {"kind": "derivative", "cutoff_hz": 20},
+]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=float, nargs="+", default=[1e6, 2e6, 4e6, 8e6])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'filter':<34}{'rows':>12}{'time [s]':>10}{'ns/sample':>11}")
+
+    for n_rows in (int(n) for n in args.rows):
+        values = np.cumsum(rng.normal(size=n_rows)) + rng.normal(scale=5.0, size=n_rows)
+        times_ns = (np.arange(n_rows) * (1e9 / SAMPLE_RATE_HZ)).astype(np.int64)
+
+        for spec in FILTERS:
+            best = float("inf")
+            for _ in range(args.repeat):
+                t_start = time.perf_counter()
+                label, _, _ = ApplyFilter(spec, values, times_ns)
+                best = min(best, time.perf_counter() - t_start)
+            print(f"{label:<34}{n_rows:>12,}{best:>10.3f}{best / n_rows * 1e9:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Load time and peak memory of PlotParquet's parquet loading: tagged Arrow path vs the full pandas clean-up.
+
+    uv run benchmarks/bench_load.py data/test.parquet
+
+Each mode runs in a fresh interpreter so peak RSS is not shared between them.
+"""
+import argparse, json, os, resource, subprocess, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def RunMode(parquet_path: str, mode: str) -> dict:
+    from main import BuildSensorTraces, ReadParquetFrame, SENSORS_TO_PLOT
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t_start = time.perf_counter()
+    df = ReadParquetFrame(parquet_path, trust_layout=mode == "arrow")
+    load_s = time.perf_counter() - t_start
+
+    # What the downsampler then does with the loaded columns
+    t_start = time.perf_counter()
+    index_values = df.index.values
+    for sensor in SENSORS_TO_PLOT:
+        if sensor["column"] in df.columns:
+            BuildSensorTraces(sensor, index_values, df[sensor["column"]], None)
+    thin_s = time.perf_counter() - t_start
+
+    return {
+        "mode": mode,
+        "rows": len(df),
+        "load_s": load_s,
+        "thin_s": thin_s,
+        "columns": len(df.columns),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_before_mb": rss_before / 1024,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("parquet_path")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--mode", choices=["arrow", "pandas"], default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.mode:
+        print(json.dumps(RunMode(args.parquet_path, args.mode)))
+        return
+
+    for mode in ("pandas", "arrow"):
+        runs = []
+        for _ in range(args.repeat):
+            out = subprocess.run(
+                [sys.executable, __file__, args.parquet_path, "--mode", mode],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        best = min(runs, key=lambda r: r["load_s"])
+        print(
+            f"{mode:>6}: load {best['load_s']:.3f} s, thin {best['thin_s']:.3f} s, "
+            f"peak RSS {best['peak_rss_mb']:.0f} MB (+{best['peak_rss_mb'] - best['rss_before_mb']:.0f} MB), "
+            f"{best['columns']} columns x {best['rows']} rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import argparse, hashlib, html, json, os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from thumbnails import ThumbnailSvg
+
+CATALOG_VERSION = 1
+TIME_COLUMN = "timestamp"
+RAW_SUFFIX = "_raw"  # raw readings kept next to calibrated channels; not channels of their own
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def FileFingerprint(path: str) -> str:
+    """Hash of the file tail; for parquet that is the footer, which changes whenever the data does."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(max(0, size - FINGERPRINT_BYTES))
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def ScanParquetFooter(path: str) -> dict:
+    """Describe a converted test using only the parquet footer (no row data is read)."""
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.metadata
+    names = parquet_file.schema_arrow.names
+
+    null_counts = dict.fromkeys(names, 0)
+    stats_missing = set()
+    time_min = time_max = None
+
+    for rg_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg_index)
+        for col_index in range(row_group.num_columns):
+            column = row_group.column(col_index)
+            name = column.path_in_schema
+            stats = column.statistics
+
+            if stats is None:
+                stats_missing.add(name)
+                continue
+
+            null_counts[name] = null_counts.get(name, 0) + stats.null_count
+
+            if name == TIME_COLUMN and stats.has_min_max:
+                time_min = stats.min if time_min is None else min(time_min, stats.min)
+                time_max = stats.max if time_max is None else max(time_max, stats.max)
+
+    # Without statistics we cannot tell an empty channel apart, so keep it listed
+    channels = [
+        name
+        for name in names
+        if name != TIME_COLUMN
+        and not name.endswith(RAW_SUFFIX)
+        and (name in stats_missing or null_counts[name] < metadata.num_rows)
+    ]
+
+    start = time_min.isoformat() if time_min is not None else None
+    end = time_max.isoformat() if time_max is not None else None
+    duration_s = (time_max - time_min).total_seconds() if time_min is not None else None
+
+    return {
+        "rows": metadata.num_rows,
+        "row_groups": metadata.num_row_groups,
+        "start": start,
+        "end": end,
+        "duration_s": duration_s,
+        "channels": channels,
+    }
+
+
+def LoadCatalog(catalog_path: str) -> dict:
+    if os.path.exists(catalog_path):
+        with open(catalog_path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+        if catalog.get("version") == CATALOG_VERSION:
+            return catalog
+        print(f"Catalog {catalog_path} has an old format; rebuilding")
+    return {"version": CATALOG_VERSION, "tests": {}}
+
+
+def ThumbnailPath(output_dir: str, stem: str) -> str:
+    return os.path.join(output_dir, "thumbnails", f"{stem}.svg")
+
+
+def UpdateCatalog(data_dir: str, catalog_path: str, thumbnails: bool = False, output_dir: str = "output") -> dict:
+    """Bring the catalog in line with data_dir, rescanning only files that changed.
+
+    With thumbnails, each new or changed test also gets an SVG sparkline in output_dir/thumbnails (this reads a
+    few columns of row data). The files outlive the parquet, which CI does not commit for converted CSVs.
+    """
+    catalog = LoadCatalog(catalog_path)
+    old_tests = catalog["tests"]
+    tests = {}
+    scanned = 0
+
+    for path in sorted(Path(data_dir).glob("*.parquet")):
+        name = path.name
+        stat = path.stat()
+        entry = old_tests.get(name)
+
+        unchanged = entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+        rescanned = False
+
+        if not unchanged:
+            # Fresh checkouts touch every mtime, so confirm with the footer hash before rescanning
+            fingerprint = FileFingerprint(str(path))
+            if entry and entry["size"] == stat.st_size and entry["fingerprint"] == fingerprint:
+                entry["mtime"] = stat.st_mtime
+            else:
+                print(f"Scanning {path}...")
+                entry = ScanParquetFooter(str(path))
+                entry.update(size=stat.st_size, mtime=stat.st_mtime, fingerprint=fingerprint)
+                scanned += 1
+                rescanned = True
+
+        entry.pop("thumbnail", None)  # older catalogs kept the SVG inline
+        thumbnail_path = ThumbnailPath(output_dir, path.stem)
+        if thumbnails and (rescanned or not os.path.exists(thumbnail_path)):
+            svg = ThumbnailSvg(str(path))
+            if svg is not None:
+                os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+                with open(thumbnail_path, "w", encoding="utf-8") as f:
+                    f.write(svg)
+
+        tests[name] = entry
+
+    removed = sorted(set(old_tests) - set(tests))
+    for name in removed:
+        print(f"Dropping {name} from catalog (file removed)")
+
+    catalog["tests"] = tests
+    catalog["updated"] = datetime.now(timezone.utc).isoformat()
+
+    with open(catalog_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=1)
+
+    print(f"✓ Catalog {catalog_path}: {len(tests)} tests, {scanned} rescanned, {len(removed)} removed")
+    return catalog
+
+
+def _FormatSize(n_bytes: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n_bytes < 1024 or unit == "GB":
+            return f"{n_bytes:.0f} {unit}" if unit == "B" else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+
+
+def _SummaryEntry(summary_path: str) -> dict:
+    """Catalog-shaped entry from a conversion summary sidecar, for plots whose parquet is not in the tree."""
+    with open(summary_path, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    return {
+        "rows": summary["rows"],
+        "start": summary["start"],
+        "duration_s": summary["duration_s"],
+        "channels": [name for name, s in summary["channels"].items() if s["count"]],
+        "size": None,
+    }
+
+
+def IndexHtml(catalog: dict, data_dir: str, output_dir: str, pdf_path: str | None) -> str:
+    entries = {os.path.splitext(name)[0]: entry for name, entry in catalog["tests"].items()}
+
+    # CSV inputs are converted in CI but only their plots and sidecars are committed, so keep listing those
+    for plot_path in Path(output_dir).glob("*.html"):
+        stem = plot_path.stem
+        if stem in entries or stem == "index":
+            continue
+        summary_path = os.path.join(data_dir, f"{stem}.summary.json")
+        if os.path.exists(summary_path):
+            entries[stem] = _SummaryEntry(summary_path)
+        else:
+            entries[stem] = {"rows": None, "start": None, "duration_s": None, "channels": [], "size": None}
+
+    rows = []
+    for stem, entry in sorted(entries.items(), key=lambda item: item[1]["start"] or "", reverse=True):
+        plot_path = os.path.join(output_dir, f"{stem}.html")
+        summary_path = os.path.join(data_dir, f"{stem}.summary.json")
+
+        if os.path.exists(plot_path):
+            name_cell = f"<a href='{html.escape(plot_path)}'>{html.escape(stem)}</a>"
+        else:
+            name_cell = html.escape(stem)
+        if os.path.exists(summary_path):
+            name_cell += f" (<a href='{html.escape(summary_path)}'>summary</a>)"
+
+        thumbnail_path = ThumbnailPath(output_dir, stem)
+        thumbnail_cell = ""
+        if os.path.exists(thumbnail_path):
+            thumbnail_cell = f"<img src='{html.escape(thumbnail_path)}' alt='' loading='lazy'>"
+
+        channels = entry["channels"]
+        duration = entry["duration_s"]
+        n_rows = entry["rows"]
+        size = entry["size"]
+        rows.append(
+            "<tr>"
+            f"<td>{name_cell}</td>"
+            f"<td>{html.escape(entry['start'] or '')}</td>"
+            f"<td data-sort='{duration or 0}'>{'' if duration is None else f'{duration:.1f}'}</td>"
+            f"<td data-sort='{n_rows or 0}'>{'' if n_rows is None else f'{n_rows:,}'}</td>"
+            f"<td data-sort='{len(channels)}' title='{html.escape(', '.join(channels))}'>{len(channels)}</td>"
+            f"<td data-sort='{size or 0}'>{'' if size is None else _FormatSize(size)}</td>"
+            f"<td>{thumbnail_cell}</td>"
+            "</tr>"
+        )
+
+    if pdf_path and os.path.exists(pdf_path):
+        pdf_html = f"<h2>CMS Master P&amp;ID</h2><iframe src='{html.escape(pdf_path)}' width='100%' height='800px'></iframe>"
+    else:
+        pdf_html = "<p>No PDF found.</p>"
+
+    return f"""<html><head><title>Simple Data Plotter - Index</title>
+<style>
+    body {{ font-family: sans-serif; }}
+    table {{ border-collapse: collapse; }}
+    th, td {{ border: 1px solid #999; padding: 3px 8px; text-align: left; }}
+    th {{ cursor: pointer; background: #eee; }}
+</style>
+</head><body>
+<h1>da plots</h1>
+<table id="catalog">
+<thead><tr><th>Test</th><th>Start (UTC)</th><th>Duration [s]</th><th>Rows</th><th>Channels</th><th>Size</th><th>Preview</th></tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+<p>old plotter: <a href="https://psp.rajanphadnis.com">psp.rajanphadnis.com</a></p>
+{pdf_html}
+<script>
+(function() {{
+    // Click a header to sort by that column; click again to reverse
+    const table = document.getElementById("catalog");
+    const body = table.tBodies[0];
+    table.querySelectorAll("th").forEach((th, col) => {{
+        let ascending = true;
+        th.addEventListener("click", () => {{
+            const key = row => {{
+                const cell = row.cells[col];
+                const sortValue = cell.dataset.sort;
+                return sortValue !== undefined ? parseFloat(sortValue) : cell.textContent.trim();
+            }};
+            const rows = Array.from(body.rows);
+            rows.sort((a, b) => {{
+                const ka = key(a), kb = key(b);
+                const cmp = (typeof ka === "number") ? ka - kb : ka.localeCompare(kb);
+                return ascending ? cmp : -cmp;
+            }});
+            rows.forEach(row => body.appendChild(row));
+            ascending = !ascending;
+        }});
+    }});
+}})();
+</script>
+</body></html>
+"""
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build a catalog of converted tests from parquet footers")
+    ap.add_argument("--data-dir", default="data")
+    ap.add_argument("--catalog", default=None, help="catalog file (default: <data-dir>/catalog.json)")
+    ap.add_argument("--output-dir", default="output", help="where the plot pages live, for linking")
+    ap.add_argument("--html", default=None, help="also write an index page here")
+    ap.add_argument(
+        "--thumbnails",
+        action="store_true",
+        help="add SVG sparklines of the key channels, saved as <output-dir>/thumbnails/<name>.svg",
+    )
+    ap.add_argument("--pdf", default="PSPL_CMS_MASTER_11192025.pdf", help="P&ID to embed in the index page")
+    args = ap.parse_args()
+
+    catalog_path = args.catalog or os.path.join(args.data_dir, "catalog.json")
+    catalog = UpdateCatalog(args.data_dir, catalog_path, args.thumbnails, args.output_dir)
+
+    if args.html:
+        with open(args.html, "w", encoding="utf-8") as f:
+            f.write(IndexHtml(catalog, args.data_dir, args.output_dir, args.pdf))
+        print(f"✓ Index saved to {args.html}")
+
+
+if __name__ == "__main__":
+    main()
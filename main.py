@@ -1,13 +1,23 @@
-import argparse, os, re
-from collections import defaultdict
-import numpy as np, pandas as pd, plotly.graph_objects as go, plotly.io as pio
-import random
+import argparse, base64, gzip, hashlib, json, os, re
+from collections import OrderedDict, defaultdict
+import numpy as np, pandas as pd, plotly.graph_objects as go, plotly.io as pio, plotly.offline
+import pyarrow as pa, pyarrow.feather as feather, pyarrow.parquet as pq
+from plotly.subplots import make_subplots
+import random, threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 THEME = "plotly_white"
 # MAX_POINTS_PER_TRACE = 1_000_000
 MAX_POINTS_PER_TRACE = 50_000
 
+# Smaller row groups let time-window readers skip most of a file using footer statistics alone
+PARQUET_ROW_GROUP_SIZE = 131_072
+
+# Schema metadata the converter writes so loaders can trust the file layout instead of re-checking it
+PARQUET_LAYOUT_KEY = b"data_plotter.layout"
+PARQUET_LAYOUT = {"sorted_by": "timestamp", "timestamp_nulls": 0, "timestamp_tz": "UTC"}
+
 
 use_davids_auto_sensors = True
 
@@ -252,7 +262,28 @@ else:
         SENSORS_TO_PLOT.append({"column": sensor_name, "name": sensor_name, "color": sensor_color, "yaxis": sensor_axis},)
 
 
+# Extra filtered traces per sensor, computed on the native-rate samples before thinning.
+# Each entry adds one trace next to the raw one:
+#   {"kind": "rolling_mean", "window_s": 0.05}
+#   {"kind": "rolling_median", "window_s": 0.02}
+#   {"kind": "lowpass", "cutoff_hz": 20, "order": 4}      (zero-phase, Butterworth magnitude)
+#   {"kind": "derivative", "cutoff_hz": 20}               (cutoff optional; low-passes first)
+# None by default; e.g. SENSOR_FILTERS = {"FMS": [{"kind": "lowpass", "cutoff_hz": 20}]}
+SENSOR_FILTERS = {}
+
+for sensor in SENSORS_TO_PLOT:
+    sensor.setdefault("filters", SENSOR_FILTERS.get(sensor["column"], []))
+
+
 X_AXIS_LABEL = "Time [H:M:S:milliseconds]"
+RELATIVE_X_AXIS_LABEL = "Time from T-0 [s]"
+
+# --relative-time event: T-0 is the first sample where this sensor crosses the given fraction of its range
+EVENT_SENSOR = "PT-CHAMBER"
+EVENT_THRESHOLD_FRACTION = 0.5
+
+# float32 offsets are used when they still resolve this step everywhere on the axis, else float64
+RELATIVE_TIME_RESOLUTION_S = 1e-5
 Y_AXIS_LABELS = {
     "y1": "Pressure [psia]",
     "y2": "Position Indicator [0/1]",
@@ -260,7 +291,10 @@ Y_AXIS_LABELS = {
     "y4": "RTD Voltage [V]",
     "y5": "Mass [lbf]",
     "y6": "unknown sensor [n/a]",
+    "y7": "Rate of change [unit/s]",
 }
+# Axis titles used once a calibration table has converted its channels to other units (see AxisLabel)
+CALIBRATED_AXIS_NAMES = {"y4": "RTD"}
 
 
 DEV5_TIME, DEV6_TIME = "Dev5_BCLS_ai_time", "Dev6_BCLS_ai_time"
@@ -438,33 +472,670 @@ def FindGroups(csv_columns):
     return groups
 
 
-def ConvertCSVToParquet(input_csv: str) -> str:
-    """Optimized CSV to Parquet conversion"""
-    print("Reading CSV header...")
-    header = pd.read_csv(input_csv, nrows=0)
-    csv_columns = list(header.columns)
+def SummaryPath(parquet_path: str) -> str:
+    return f"{os.path.splitext(parquet_path)[0]}.summary.json"
+
+
+def _JsonFloat(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def SummarizeTimeGroup(subset: pd.DataFrame, time_column: str | None) -> dict:
+    """Per-channel statistics for one cleaned time group (datetime index, numeric columns)."""
+    times = subset.index.as_unit("ns").asi8
+    n_rows = len(subset)
+    summary = {}
+
+    for column in subset.columns:
+        values = subset[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        count = int(np.count_nonzero(valid))
+
+        if count == 0:
+            summary[column] = {"group": time_column, "count": 0, "nan_fraction": 1.0}
+            continue
+
+        valid_idx = np.flatnonzero(valid)
+        first_ns, last_ns = int(times[valid_idx[0]]), int(times[valid_idx[-1]])
+        span_s = (last_ns - first_ns) / 1e9
+        present = values[valid_idx]
+
+        summary[column] = {
+            "group": time_column,
+            "count": count,
+            "min": _JsonFloat(present.min()),
+            "max": _JsonFloat(present.max()),
+            "mean": _JsonFloat(present.mean()),
+            "std": _JsonFloat(present.std()),
+            "first_time": pd.Timestamp(first_ns, tz="UTC").isoformat(),
+            "last_time": pd.Timestamp(last_ns, tz="UTC").isoformat(),
+            "sample_rate_hz": _JsonFloat((count - 1) / span_s) if span_s > 0 else None,
+            "nan_fraction": float(1 - count / n_rows),
+        }
+
+        starts = RunStarts(present)
+        if IsDigitalChannel(column, present, starts):
+            summary[column].update(digital=True, transitions=int(np.count_nonzero(present[1:] != present[:-1])))
+
+    return summary
+
+
+# Data-quality scan thresholds
+QUALITY_GAP_FACTOR = 10  # a sample interval this many times the group's median is a dropout
+QUALITY_FLATLINE_S = 2.0  # an analog channel repeating the exact same value this long is stuck
+QUALITY_SPIKE_SIGMA = 10.0  # excursions beyond this many local robust sigmas of the first difference
+QUALITY_SPIKE_WINDOW = 256  # samples per block of the local robust scale
+QUALITY_SPIKE_MAX_SAMPLES = 3  # a spike is back at its starting level within this many samples
+QUALITY_MERGE_S = 0.5  # flagged intervals closer than this are stored as one
+QUALITY_MAX_INTERVALS = 25  # stored per channel and kind; the summary keeps the full count
+
+# Plausible range per analog sensor type (matched like SensorTypeToAxis); channels not listed are not scanned
+QUALITY_RANGES = {
+    "PT-": (-15.0, 5000.0),  # psia
+    "TC-": (0.0, 1500.0),  # K
+    "RTD-": (-10.0, 10.0),  # V
+    "FMS": (-500.0, 5000.0),  # lbf
+}
+
+QUALITY_COLORS = {
+    "gap": "#888888",
+    "flatline": "#FFA500",
+    "out_of_range": "#FF0000",
+    "spike": "#FF00FF",
+}
+QUALITY_MAX_SHAPES = 300
+
+
+def _MaskRuns(mask: np.ndarray):
+    """Start and stop (exclusive) indices of the True runs in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _MergeIntervals(starts_ns, ends_ns, samples, max_gap_ns):
+    """Merge sorted intervals separated by at most max_gap_ns."""
+    if len(starts_ns) < 2:
+        return starts_ns, ends_ns, samples
+    new_group = np.concatenate(([True], starts_ns[1:] - ends_ns[:-1] > max_gap_ns))
+    first = np.flatnonzero(new_group)
+    last = np.concatenate((first[1:], [len(starts_ns)])) - 1
+    return starts_ns[first], ends_ns[last], np.add.reduceat(samples, first)
+
+
+def _QualityRange(column: str):
+    column_upper = column.upper()
+    for tag, value_range in QUALITY_RANGES.items():
+        if tag in column_upper:
+            return value_range
+    return None
+
+
+def _LocalScale(diffs: np.ndarray, window: int) -> np.ndarray:
+    """Robust sigma (1.4826 * MAD) of the first differences around each one.
+
+    MADs are taken over blocks of window samples; each difference gets the largest of its own and the two
+    neighbouring blocks, so a block boundary inside a noisy stretch does not leave a quiet scale behind.
+    """
+    n_blocks = -(-len(diffs) // window)
+    padded = np.full(n_blocks * window, np.nan)
+    padded[: len(diffs)] = diffs
+    blocks = padded.reshape(n_blocks, window)
+    block_median = np.nanmedian(blocks, axis=1, keepdims=True)
+    block_scale = 1.4826 * np.nanmedian(np.abs(blocks - block_median), axis=1)
+
+    neighbours = np.pad(block_scale, 1, mode="edge")
+    block_scale = np.maximum(np.maximum(neighbours[:-2], neighbours[1:-1]), neighbours[2:])
+    return np.repeat(block_scale, window)[: len(diffs)]
+
+
+def ScanQuality(
+    subset: pd.DataFrame, time_column: str | None, channel_summaries: dict, raw: pd.DataFrame | None = None
+) -> list:
+    """Flag dropouts, stuck channels, out-of-range values and spikes in one cleaned time group.
+
+    Returns compact intervals ({channel, kind, start, end, samples}) and records the
+    per-kind flag counts on the matching entries of channel_summaries.
+    raw: uncalibrated readings of calibrated channels, on subset's index. QUALITY_RANGES is written in
+    the sensors' raw units, so those channels are range-checked on these instead of their calibrated values.
+    """
+    if not subset.index.is_monotonic_increasing:
+        subset = subset.sort_index(kind="stable")
+        if raw is not None:
+            raw = raw.sort_index(kind="stable")
+
+    times = subset.index.as_unit("ns").asi8
+    flags = []
+
+    def iso(ns):
+        return pd.Timestamp(int(ns), tz="UTC").isoformat()
+
+    def record(channel, kind, starts_ns, ends_ns, samples):
+        if kind in ("out_of_range", "flatline"):
+            starts_ns, ends_ns, samples = _MergeIntervals(starts_ns, ends_ns, samples, QUALITY_MERGE_S * 1e9)
+        if channel is not None and len(starts_ns):
+            channel_summaries[channel].setdefault("flags", {})[kind] = int(len(starts_ns))
+        for start_ns, end_ns, n in zip(
+            starts_ns[:QUALITY_MAX_INTERVALS], ends_ns[:QUALITY_MAX_INTERVALS], samples[:QUALITY_MAX_INTERVALS]
+        ):
+            flags.append(
+                {
+                    "channel": channel,
+                    "group": time_column,
+                    "kind": kind,
+                    "start": iso(start_ns),
+                    "end": iso(end_ns),
+                    "samples": int(n),
+                }
+            )
+
+    # Sample-interval gaps belong to the whole group; event-driven groups (BCLS_di) are irregular by design
+    if time_column in {time for _, time in channels} and len(times) > 2:
+        dt = np.diff(times)
+        median_dt = np.median(dt)
+        if median_dt > 0:
+            gap_idx = np.flatnonzero(dt > QUALITY_GAP_FACTOR * median_dt)
+            record(None, "gap", times[gap_idx], times[gap_idx + 1], np.zeros(len(gap_idx)))
+
+    for column in subset.columns:
+        value_range = _QualityRange(column)
+        if value_range is None:
+            continue
+
+        values = subset[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        values, value_times = values[valid], times[valid]
+        if len(values) < 3:
+            continue
+
+        range_values = values
+        if raw is not None and column in raw.columns:
+            range_values = raw[column].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+        low, high = value_range
+        starts, stops = _MaskRuns((range_values < low) | (range_values > high))
+        record(column, "out_of_range", value_times[starts], value_times[stops - 1], stops - starts)
+
+        diffs = np.diff(values)
+
+        # Runs of zero first-difference are samples repeating the same reading
+        starts, stops = _MaskRuns(diffs == 0)
+        long_runs = (value_times[stops] - value_times[starts]) >= QUALITY_FLATLINE_S * 1e9
+        starts, stops = starts[long_runs], stops[long_runs]
+        record(column, "flatline", value_times[starts], value_times[stops], stops - starts + 1)
+
+        # A spike jumps away and comes back to where it started within a few samples, with no other large
+        # jumps around it. The scale is local, so a stretch of oscillation sets its own threshold
+        # instead of being measured against the quiet rest of the test.
+        median_diff = np.median(diffs)
+        global_scale = 1.4826 * np.median(np.abs(diffs - median_diff))
+        scale = np.maximum(_LocalScale(diffs, QUALITY_SPIKE_WINDOW), global_scale)
+        large = np.zeros(len(diffs) + 1, dtype=bool)  # padded so the isolation check can look one past the end
+        large[:-1] = (scale > 0) & (np.abs(diffs - median_diff) > QUALITY_SPIKE_SIGMA * scale)
+
+        spike_starts, spike_ends = [], []
+        out_idx = np.flatnonzero(large[:-1])
+        out_idx = out_idx[(out_idx == 0) | ~large[np.maximum(out_idx - 1, 0)]]
+        quiet_between = np.ones(len(out_idx), dtype=bool)
+        for width in range(1, QUALITY_SPIKE_MAX_SAMPLES + 1):
+            back_idx = out_idx + width
+            inside = back_idx < len(diffs)
+            candidates, back_idx = out_idx[inside], back_idx[inside]
+            returned = (
+                quiet_between[inside]
+                & large[back_idx]
+                & ~large[back_idx + 1]
+                & (np.sign(diffs[back_idx]) != np.sign(diffs[candidates]))
+                & (np.abs(values[back_idx + 1] - values[candidates]) < 0.5 * np.abs(diffs[candidates]))
+            )
+            spike_starts.append(candidates[returned] + 1)
+            spike_ends.append(back_idx[returned])
+            # A wider spike needs its plateau (the differences between the two jumps) to be quiet
+            quiet_between[inside] &= ~large[back_idx]
+        spike_starts, spike_ends = np.concatenate(spike_starts), np.concatenate(spike_ends)
+        order = np.argsort(spike_starts, kind="stable")
+        spike_starts, spike_ends = spike_starts[order], spike_ends[order]
+        record(
+            column, "spike", value_times[spike_starts], value_times[spike_ends], spike_ends - spike_starts + 1
+        )
+
+    return flags
+
+
+def QualityShapes(quality: list, index: pd.DatetimeIndex, t0: pd.Timestamp | None) -> list:
+    """Shaded regions (intervals) and vertical lines (spikes) for quality flags inside the plotted window."""
+    if not quality or index.empty:
+        return []
+
+    window_start, window_end = index[0], index[-1]
+    shapes = []
+
+    for flag in quality:
+        start, end = pd.Timestamp(flag["start"]), pd.Timestamp(flag["end"])
+        if end < window_start or start > window_end:
+            continue
+
+        if t0 is not None:
+            x0, x1 = (start - t0).total_seconds(), (end - t0).total_seconds()
+        else:
+            x0, x1 = start, end
+
+        color = QUALITY_COLORS[flag["kind"]]
+        name = f"{flag['kind']}: {flag['channel'] or flag['group']}"
+        if x0 == x1:
+            shapes.append(
+                dict(type="line", xref="x", yref="paper", x0=x0, x1=x1, y0=0, y1=1, name=name,
+                     line=dict(color=color, width=1), opacity=0.5)
+            )
+        else:
+            shapes.append(
+                dict(type="rect", xref="x", yref="paper", x0=x0, x1=x1, y0=0, y1=1, name=name,
+                     fillcolor=color, opacity=0.15, line=dict(width=0), layer="below")
+            )
+
+        if len(shapes) >= QUALITY_MAX_SHAPES:
+            print(f"Warning: more than {QUALITY_MAX_SHAPES} quality flags in view; showing the first ones")
+            break
+
+    return shapes
+
+
+def WriteSummary(
+    parquet_path: str,
+    channel_summaries: dict,
+    source: str,
+    rows: int,
+    quality: list | None = None,
+) -> str:
+    firsts = [s["first_time"] for s in channel_summaries.values() if s["count"]]
+    lasts = [s["last_time"] for s in channel_summaries.values() if s["count"]]
+    start = min(firsts) if firsts else None
+    end = max(lasts) if lasts else None
+
+    summary = {
+        "source": os.path.basename(source),
+        "parquet": os.path.basename(parquet_path),
+        "rows": int(rows),
+        "start": start,
+        "end": end,
+        "duration_s": (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds() if firsts else None,
+        "channels": dict(sorted(channel_summaries.items())),
+        "quality": quality or [],
+    }
+
+    summary_path = SummaryPath(parquet_path)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1)
+    print(f"Saved channel summary to {summary_path}")
+    return summary_path
+
+
+def LoadSummary(parquet_path: str) -> dict | None:
+    summary_path = SummaryPath(parquet_path)
+    if not os.path.exists(summary_path):
+        return None
+    with open(summary_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def SummaryTableHtml(summary: dict) -> str:
+    def fmt(value, spec=".3f"):
+        return "" if value is None else format(value, spec)
+
+    rows = []
+    for name, s in summary["channels"].items():
+        rows.append(
+            "<tr>"
+            f"<td>{name}</td><td>{s.get('group') or ''}</td><td>{s['count']}</td>"
+            f"<td>{fmt(s.get('min'))}</td><td>{fmt(s.get('max'))}</td>"
+            f"<td>{fmt(s.get('mean'))}</td><td>{fmt(s.get('std'))}</td>"
+            f"<td>{s.get('first_time') or ''}</td><td>{s.get('last_time') or ''}</td>"
+            f"<td>{fmt(s.get('sample_rate_hz'), '.1f')}</td><td>{fmt(s['nan_fraction'], '.1%')}</td>"
+            f"<td>{', '.join(f'{kind} x{n}' for kind, n in s.get('flags', {}).items())}</td>"
+            "</tr>"
+        )
+
+    return f"""
+        <div id="channelSummary" style="font-family:sans-serif; font-size:12px; margin:20px;">
+            <h3>Channel summary ({summary['rows']} rows, {fmt(summary.get('duration_s'), '.1f')} s)</h3>
+            <table border="1" cellspacing="0" cellpadding="3">
+                <tr><th>Channel</th><th>Time group</th><th>Samples</th><th>Min</th><th>Max</th>
+                <th>Mean</th><th>Std</th><th>First valid</th><th>Last valid</th>
+                <th>Rate [Hz]</th><th>NaN</th><th>Quality flags</th></tr>
+                {"".join(rows)}
+            </table>
+        </div>
+        """
+
+
+def ResampleToGrid(subset: pd.DataFrame, period: pd.Timedelta) -> pd.DataFrame:
+    """Aggregate a time group onto the epoch-anchored grid of the given period.
+
+    Analog channels take the mean of each bin. Digital channels (see IsDigitalChannel) take the last
+    valid sample, so a valve state stays 0 or 1 instead of averaging to 0.5 across a transition.
+    Every group binned with the same period lands on the same timestamps, so the
+    outer join afterwards lines devices up exactly instead of only where samples happen to coincide.
+    """
+    period_ns = int(period.value)
+    bins, inverse = np.unique(subset.index.as_unit("ns").asi8 // period_ns, return_inverse=True)
+
+    resampled = {}
+    for column in subset.columns:
+        values = subset[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        present = values[valid]
+        if len(present) and IsDigitalChannel(column, present, RunStarts(present)):
+            last = np.full(len(bins), -1)
+            np.maximum.at(last, inverse[valid], np.flatnonzero(valid))
+            resampled[column] = np.where(last >= 0, values[last], np.nan)
+            continue
+        sums = np.bincount(inverse, weights=np.where(valid, values, 0.0), minlength=len(bins))
+        counts = np.bincount(inverse, weights=valid, minlength=len(bins))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            resampled[column] = sums / counts
+
+    index = pd.DatetimeIndex(bins * period_ns, tz="UTC", name=subset.index.name)
+    return pd.DataFrame(resampled, index=index)
+
+
+def AlignNearest(frames: dict, tolerance: pd.Timedelta) -> pd.DataFrame:
+    """Join device frames onto the densest one, matching each row to the nearest sample within tolerance."""
+    # merge_asof needs identical key dtypes; parsing gives us-resolution indexes and a clock offset ns ones
+    frames = {time_column: frame.set_axis(frame.index.as_unit("ns")) for time_column, frame in frames.items()}
+    reference_column = max(frames, key=lambda t: len(frames[t]))
+    aligned = frames[reference_column]
+
+    for time_column, frame in frames.items():
+        if time_column == reference_column:
+            continue
+        aligned = pd.merge_asof(
+            aligned,
+            frame,
+            left_index=True,
+            right_index=True,
+            direction="nearest",
+            tolerance=tolerance,
+        )
+        print(f"  Aligned {time_column} onto {reference_column} (tolerance {tolerance})")
+
+    return aligned
+
+
+# Inputs the converter accepts; compressed CSVs are decompressed as a stream by pandas (.zst needs zstandard)
+CONVERTIBLE_SUFFIXES = (".csv", ".csv.gz", ".csv.zst", ".tdms")
+
+
+def InputBase(input_path: str) -> str:
+    """Path without its data suffix, so data/test.csv.gz becomes data/test."""
+    for suffix in CONVERTIBLE_SUFFIXES:
+        if input_path.lower().endswith(suffix):
+            return input_path[: -len(suffix)]
+    return os.path.splitext(input_path)[0]
+
+
+def _TDMSTimeColumn(channel_names: list, channel_name: str) -> str:
+    """Name a waveform channel's synthesized time column so FindGroups pairs it like the CSV export does."""
+    if any(name in DEV5_CHANNELS for name in channel_names):
+        return DEV5_TIME
+    if any(name in DEV6_CHANNELS for name in channel_names):
+        return DEV6_TIME
+    return f"BCLS_di_time_{channel_name}"
+
+
+def ReadTDMS(input_tdms: str) -> pd.DataFrame:
+    """Read an NI TDMS file into the same column layout as its CSV export.
+
+    Channels are streamed segment by segment. Explicit time channels are kept as they are;
+    waveform channels without one get a time column built from wf_start_time/wf_increment.
+    """
+    try:
+        from nptdms import TdmsFile
+    except ImportError:
+        raise ImportError("Reading .tdms files needs npTDMS (pip install npTDMS)")
+
+    columns = {}
+    with TdmsFile.open(input_tdms) as tdms_file:
+        parts = defaultdict(list)
+        for chunk in tdms_file.data_chunks():
+            for group_chunk in chunk.groups():
+                for channel_chunk in group_chunk.channels():
+                    parts[(group_chunk.name, channel_chunk.name)].append(channel_chunk[:])
+
+        for group in tdms_file.groups():
+            channel_names = [channel.name for channel in group.channels()]
+
+            for channel in group.channels():
+                values = parts.get((group.name, channel.name))
+                if not values:
+                    continue
+                columns[channel.name] = pd.Series(np.concatenate(values))
+
+                if "wf_increment" not in channel.properties:
+                    continue
+                time_column = _TDMSTimeColumn(channel_names, channel.name)
+                # An explicit time channel in the group wins over the waveform timing
+                if time_column not in channel_names and time_column not in columns:
+                    properties = channel.properties
+                    start_ns = np.datetime64(properties["wf_start_time"], "ns")
+                    start_ns += np.timedelta64(round(properties.get("wf_start_offset", 0.0) * 1e9), "ns")
+                    offsets_ns = np.rint(np.arange(len(columns[channel.name])) * properties["wf_increment"] * 1e9)
+                    columns[time_column] = pd.Series(start_ns + offsets_ns.astype("timedelta64[ns]"))
+
+    if not columns:
+        raise ValueError(f"No channel data found in {input_tdms}")
+
+    # Channels of different lengths are NaN/NaT-padded, exactly like the ragged columns of the CSV export
+    return pd.DataFrame(columns)
+
+
+# Calibration tables (JSON) turn raw DAQ readings into engineering units during conversion:
+#   {"version": "2025-11",
+#    "channels": {"RTD-OX": {"poly": [c0, c1, c2], "unit": "K"}, "PT-OX-02": {"scale": 1.0, "offset": -0.4}},
+#    "tests": {"04-06-2025-cold_flow": {"PT-OX-02": {"offset": -0.6}}}}
+# poly coefficients are in increasing order and replace scale; offset is added last. "tests" overrides are
+# merged into the channel entries for the test of that name. Raw readings are kept as <channel>_raw columns.
+CALIBRATION_KEY = b"data_plotter.calibration"
+RAW_SUFFIX = "_raw"
+
+
+def LoadCalibration(calibration_path: str) -> dict:
+    with open(calibration_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def CalibrationSpecs(calibration: dict, test_name: str) -> dict:
+    """Effective per-channel calibration for one test (channel entries with its overrides merged in)."""
+    specs = {channel: dict(spec) for channel, spec in calibration.get("channels", {}).items()}
+    for channel, override in calibration.get("tests", {}).get(test_name, {}).items():
+        specs.setdefault(channel, {}).update(override)
+    return specs
+
+
+def CalibrationHash(spec: dict) -> str:
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def CalibratedValues(raw: np.ndarray, spec: dict) -> np.ndarray:
+    if "poly" in spec:
+        values = np.polynomial.polynomial.polyval(raw, spec["poly"])
+    else:
+        values = raw * spec.get("scale", 1.0)
+    return values + spec.get("offset", 0.0)
+
+
+def StoredCalibration(schema: pa.Schema) -> dict:
+    """Calibration tag of a converted test: {"version", "channels": {channel: spec hash}}."""
+    raw = (schema.metadata or {}).get(CALIBRATION_KEY)
+    return json.loads(raw) if raw else {"version": None, "channels": {}}
+
+
+def RecalibrateParquet(parquet_path: str, calibration: dict) -> list:
+    """Bring a converted test in line with a calibration table; returns the channels recomputed.
+
+    Only channels whose effective spec hash changed are recomputed, from their _raw column.
+    Every other column is copied through as Arrow data without being converted.
+    """
+    parquet_file = pq.ParquetFile(parquet_path)
+    schema = parquet_file.schema_arrow
+    stored = StoredCalibration(schema)["channels"]
+
+    test_name = os.path.basename(InputBase(parquet_path))
+    specs = {c: spec for c, spec in CalibrationSpecs(calibration, test_name).items() if c in schema.names}
+    hashes = {c: CalibrationHash(spec) for c, spec in specs.items()}
+    affected = sorted(c for c in set(hashes) | set(stored) if hashes.get(c) != stored.get(c))
+
+    if not affected:
+        print(f"Calibration of {parquet_path} is up to date (version {calibration.get('version')})")
+        return []
+
+    table = parquet_file.read()
+    del parquet_file
+
+    # A calibrated channel without its raw column cannot be recomputed; leave it and its stored hash alone
+    skipped = [c for c in affected if c in stored and f"{c}{RAW_SUFFIX}" not in table.column_names]
+    for column in skipped:
+        print(f"Warning: {column} was calibrated but has no {column}{RAW_SUFFIX} column; leaving it unchanged")
+    affected = [c for c in affected if c not in skipped]
+    tag_hashes = {c: h for c, h in hashes.items() if c not in skipped}
+    tag_hashes.update({c: stored[c] for c in skipped})
+
+    if not affected:
+        print(f"Nothing in {parquet_path} can be recalibrated")
+        return []
+
+    print(f"Recalibrating {len(affected)} channels of {parquet_path}: {affected}")
+    for column in affected:
+        raw_name = f"{column}{RAW_SUFFIX}"
+        has_raw = raw_name in table.column_names
+        raw = table.column(raw_name if has_raw else column)
+
+        if column in specs:
+            values = CalibratedValues(raw.to_numpy().astype(np.float64), specs[column])
+            table = table.set_column(table.schema.get_field_index(column), column, pa.array(values, from_pandas=True))
+            if not has_raw:
+                table = table.append_column(raw_name, raw)
+        else:
+            # Dropped from the table: the raw readings become the channel again
+            table = table.set_column(table.schema.get_field_index(column), column, raw)
+            table = table.remove_column(table.schema.get_field_index(raw_name))
+
+    tag = {"version": calibration.get("version"), "channels": tag_hashes}
+    metadata = {k: v for k, v in (schema.metadata or {}).items() if k != b"pandas"}  # column list is stale now
+    metadata[CALIBRATION_KEY] = json.dumps(tag).encode()
+
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path, row_group_size=PARQUET_ROW_GROUP_SIZE)
+    os.replace(tmp_path, parquet_path)
+
+    summary = LoadSummary(parquet_path)
+    if summary is not None:
+        # Statistics and quality flags of the recomputed channels describe the old values; redo them per time group
+        index = pd.DatetimeIndex(table.column("timestamp").to_pandas(), name="timestamp")
+        channel_summaries = summary["channels"]
+        by_group = defaultdict(list)
+        for column in affected:
+            if column in channel_summaries:
+                by_group[channel_summaries[column].get("group")].append(column)
+
+        quality = [flag for flag in summary.get("quality", []) if flag["channel"] not in affected]
+        for time_column, columns in by_group.items():
+            members = [
+                name for name, s in channel_summaries.items()
+                if s.get("group") == time_column and name in table.column_names
+            ]
+            group = pd.DataFrame(
+                {name: table.column(name).to_numpy(zero_copy_only=False) for name in members}, index=index
+            )
+            # Rows where any channel of the group has a sample stand in for the group's own timestamps
+            rows = group.notna().any(axis=1).to_numpy()
+            group = group[rows][columns]
+            raw = pd.DataFrame(
+                {
+                    column: table.column(f"{column}{RAW_SUFFIX}").to_numpy(zero_copy_only=False)[rows]
+                    for column in columns if column in specs
+                },
+                index=group.index,
+            )
+            entries = SummarizeTimeGroup(group, time_column)
+            flags = ScanQuality(group, time_column, entries, raw)
+            quality.extend(flag for flag in flags if flag["channel"] in columns)
+            for column in columns:
+                if column in specs:
+                    entries[column]["calibration"] = hashes[column]
+                    if "unit" in specs[column]:
+                        entries[column]["unit"] = specs[column]["unit"]
+                channel_summaries[column] = entries[column]
+
+        summary["quality"] = quality
+        with open(SummaryPath(parquet_path), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=1)
+
+    print(f"✓ Recalibrated {parquet_path} to calibration version {calibration.get('version')}")
+    return affected
+
+
+def ConvertCSVToParquet(
+    input_csv: str,
+    resample: str | None = None,
+    align_tolerance: str | None = None,
+    clock_offsets: dict | None = None,
+    calibration: dict | None = None,
+) -> str:
+    """Optimized CSV to Parquet conversion
+
+    input_csv may also be a .csv.gz/.csv.zst (decompressed as a stream) or an NI .tdms file.
+    resample: bin every time group onto a shared uniform grid with this period (e.g. "1ms")
+    align_tolerance: join the analog device groups (Dev5/Dev6) by nearest timestamp within this tolerance
+    clock_offsets: seconds to add to a time group's clock, keyed by time column
+    calibration: calibration table (see LoadCalibration) applied before statistics and quality checks
+    """
+    clock_offsets = clock_offsets or {}
+    calibration_specs = CalibrationSpecs(calibration, os.path.basename(InputBase(input_csv))) if calibration else {}
+    calibration_hashes = {}
+    resample_period = pd.Timedelta(resample) if resample else None
+    tolerance = pd.Timedelta(align_tolerance) if align_tolerance else None
+    device_time_columns = {time for _, time in channels}
+
+    is_tdms = input_csv.lower().endswith(".tdms")
+
+    if is_tdms:
+        # TDMS is binary and typed, so there is no text header pass; channels come out already numeric
+        print("Reading TDMS channels...")
+        df = ReadTDMS(input_csv)
+        csv_columns = list(df.columns)
+    else:
+        print("Reading CSV header...")
+        header = pd.read_csv(input_csv, nrows=0)
+        csv_columns = list(header.columns)
     groups = FindGroups(csv_columns)
 
     if not groups:
         raise ValueError("No valid time-column groupings found in CSV")
 
+    unknown_offsets = sorted(set(clock_offsets) - set(groups))
+    if unknown_offsets:
+        raise ValueError(f"Clock offset given for unknown time columns {unknown_offsets}; this file has {list(groups)}")
+
     usecols = {t for t in groups} | {d for ds in groups.values() for d in ds}
     print(
         f"Found {len(groups)} time column groups, {len(usecols)} total columns to process"
     )
 
-    # Read entire CSV at once with optimizations
-    print("Reading CSV data...")
-    df = pd.read_csv(
-        input_csv,
-        usecols=list(usecols),
-        low_memory=False,
-        on_bad_lines="warn",
-        engine="c",
-    )
+    if not is_tdms:
+        # Read entire CSV at once with optimizations; .gz/.zst are decompressed on the fly
+        print("Reading CSV data...")
+        df = pd.read_csv(
+            input_csv,
+            usecols=list(usecols),
+            low_memory=False,
+            on_bad_lines="warn",
+            engine="c",
+        )
 
     print("Processing time groups...")
     all_frames = []
+    device_frames = {}
+    channel_summaries = {}
+    quality = []
 
     for time_column, data_columns in groups.items():
         if time_column not in df.columns:
@@ -493,23 +1164,67 @@ def ConvertCSVToParquet(input_csv: str) -> str:
             if c in subset.columns:
                 subset[c] = pd.to_numeric(subset[c], errors="coerce")
 
-        all_frames.append(subset)
+        if time_column in clock_offsets:
+            subset.index = subset.index + pd.to_timedelta(clock_offsets[time_column], unit="s")
+            print(f"  Shifted {time_column} by {clock_offsets[time_column]} s")
+
+        raw_values = {}
+        for column in subset.columns:
+            if column in calibration_specs:
+                raw = subset[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                raw_values[column] = raw
+                subset[column] = CalibratedValues(raw, calibration_specs[column])
+                calibration_hashes[column] = CalibrationHash(calibration_specs[column])
+        if raw_values:
+            print(f"  Calibrated {len(raw_values)} channels of {time_column}")
+
+        # Statistics describe the native-rate data in engineering units, before any resampling
+        channel_summaries.update(SummarizeTimeGroup(subset, time_column))
+        raw_frame = pd.DataFrame(raw_values, index=subset.index) if raw_values else None
+        quality.extend(ScanQuality(subset, time_column, channel_summaries, raw_frame))
+        for column in subset.columns:
+            if column in calibration_hashes:
+                channel_summaries[column]["calibration"] = calibration_hashes[column]
+                if "unit" in calibration_specs[column]:
+                    channel_summaries[column]["unit"] = calibration_specs[column]["unit"]
+        subset = subset.assign(**{f"{column}{RAW_SUFFIX}": raw for column, raw in raw_values.items()})
+
+        if resample_period is not None:
+            native_rows = len(subset)
+            subset = ResampleToGrid(subset, resample_period)
+            print(f"  Resampled {time_column}: {native_rows} -> {len(subset)} rows")
+
+        if tolerance is not None and time_column in device_time_columns:
+            device_frames[time_column] = subset.sort_index()
+        else:
+            all_frames.append(subset)
         print(f"  Processed {time_column}: {len(subset)} rows, {len(subset.columns)} sensors")
 
+    if device_frames:
+        all_frames.append(AlignNearest(device_frames, tolerance))
+
     if not all_frames:
         raise ValueError("No valid data found after processing all groups")
 
     # Combine all frames with outer join
     print("Combining data frames...")
     combined = pd.concat(all_frames, axis=1, join="outer").sort_index()
-    combined = combined.reset_index().rename(columns={"index": "timestamp"})
+    combined.index.name = "timestamp"
+    combined = combined.reset_index()
 
     # Save to parquet
-    base = os.path.splitext(input_csv)[0]
+    base = InputBase(input_csv)
     parquet_path = f"{base}.parquet"
 
     print(f"Saving to {parquet_path}...")
-    combined.to_parquet(parquet_path, index=False, engine="pyarrow")
+    table = pa.Table.from_pandas(combined, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), PARQUET_LAYOUT_KEY: json.dumps(PARQUET_LAYOUT).encode()}
+    if calibration:
+        tag = {"version": calibration.get("version"), "channels": calibration_hashes}
+        metadata[CALIBRATION_KEY] = json.dumps(tag).encode()
+    pq.write_table(table.replace_schema_metadata(metadata), parquet_path, row_group_size=PARQUET_ROW_GROUP_SIZE)
+    WriteSummary(parquet_path, channel_summaries, input_csv, len(combined), quality)
+    print(f"  {len(quality)} data-quality intervals flagged")
 
     print(
         f"✓ Conversion complete: {len(combined)} rows, {len(combined.columns)} columns"
@@ -517,14 +1232,465 @@ def ConvertCSVToParquet(input_csv: str) -> str:
     return parquet_path
 
 
-def _thin(x, y, maxn):
+# Group toggle buttons: (button label, substring matched against trace names)
+TOGGLE_GROUPS = [
+    ("Toggle OX", "-OX"),
+    ("Toggle FU", "-FU"),
+    ("Toggle HE", "-HE"),
+    ("Toggle PT", "PT-"),
+    ("Toggle TC", "TC-"),
+    ("Toggle RTD", "RTD-"),
+    ("Toggle PI", "PI-"),
+    ("Toggle FMS", "FMS"),
+]
+
+
+def ToggleButtons(trace_names):
+    """updatemenus buttons carrying their precomputed trace indices.
+
+    method="skip" keeps Plotly from running its own (empty) update on click; the injected
+    script picks the indices up from the plotly_buttonclicked event and does one Plotly.update.
+    """
+    buttons = []
+    for label, tag in TOGGLE_GROUPS:
+        indices = [i for i, name in enumerate(trace_names) if tag in name]
+        buttons.append(
+            dict(
+                label=label,
+                method="skip",
+                args=[{"traces": indices, "show_all": False}],
+                name=f"btn_{label.split()[-1].lower()}",
+            )
+        )
+
+    buttons.append(
+        dict(
+            label="Show ALL",
+            method="skip",
+            args=[{"traces": list(range(len(trace_names))), "show_all": True}],
+            name="btn_all",
+        )
+    )
+    return buttons
+
+
+def TraceAxisKey(trace_yaxis):
+    """Trace axis reference ("y", "y3") -> layout key ("yaxis", "yaxis3")."""
+    axis = trace_yaxis or "y"
+    return "yaxis" if axis in ("y", "y1") else axis.replace("y", "yaxis", 1)
+
+
+def _thin_indices(n, maxn):
     if maxn is None:
         raise ValueError
 
-    if len(y) <= maxn:
-        return x.values, y.values
-    idx = np.linspace(0, len(y) - 1, maxn, dtype=int)
-    return x.values[idx], y.values[idx]
+    if n <= maxn:
+        return np.arange(n)
+    return np.linspace(0, n - 1, maxn, dtype=int)
+
+
+def _thin(x, y, maxn):
+    idx = _thin_indices(len(y), maxn)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+# State/position channels are plotted as exact transitions instead of being thinned.
+# A channel is digital if it has at most DIGITAL_MAX_LEVELS distinct values, or if its name
+# matches and its transitions still fit in one trace.
+DIGITAL_NAME_PATTERN = re.compile(r"(_STATE$|-STATE$|^SV-|^PV-|^PI-)", re.IGNORECASE)
+DIGITAL_MAX_LEVELS = 4
+
+
+def RunStarts(values: np.ndarray) -> np.ndarray:
+    """Run-length encoding of a NaN-free series: the first index of every run of equal values,
+    plus the last sample so the final level keeps its length."""
+    if len(values) < 2:
+        return np.arange(len(values))
+    starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+    if starts[-1] != len(values) - 1:
+        starts = np.append(starts, len(values) - 1)
+    return starts
+
+
+def IsDigitalChannel(name: str, values: np.ndarray, starts: np.ndarray) -> bool:
+    name_match = DIGITAL_NAME_PATTERN.search(name) is not None
+    # Analog data changes almost every sample; skip the level count for it
+    if not name_match and len(starts) > len(values) // 8:
+        return False
+    # Count levels on the first runs before sorting all of them
+    if (
+        len(np.unique(values[starts[:1024]])) <= DIGITAL_MAX_LEVELS
+        and len(np.unique(values[starts])) <= DIGITAL_MAX_LEVELS
+    ):
+        return True
+    return name_match and len(starts) <= MAX_POINTS_PER_TRACE
+
+
+# Filters: all are linear in the number of samples and work on the NaN-free native-rate series
+ROLLING_MEDIAN_CHUNK_ELEMENTS = 4_000_000  # window elements sorted at a time
+LOWPASS_BLOCK = 2**18  # FFT block length for the low-pass
+LOWPASS_SETTLE_PERIODS = 4  # overlap on each side of a block, in periods of the cutoff
+
+
+def RollingMean(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered moving average via a cumulative sum; the window shrinks at the ends."""
+    n = len(values)
+    offset = values[0]  # keeps the running sum small so long series do not lose precision
+    sums = np.concatenate(([0.0], np.cumsum(values - offset)))
+    positions = np.arange(n)
+    lo = np.maximum(positions - window // 2, 0)
+    hi = np.minimum(positions + window - window // 2, n)
+    return (sums[hi] - sums[lo]) / (hi - lo) + offset
+
+
+def RollingMedian(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered moving median, sorted a bounded chunk of windows at a time."""
+    n = len(values)
+    padded = np.pad(values, (window // 2, window - 1 - window // 2), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    out = np.empty(n)
+    step = max(1, ROLLING_MEDIAN_CHUNK_ELEMENTS // window)
+    for i in range(0, n, step):
+        out[i : i + step] = np.median(windows[i : i + step], axis=1)
+    return out
+
+
+def LowPass(values: np.ndarray, fs: float, cutoff_hz: float, order: int = 4) -> np.ndarray:
+    """Zero-phase low-pass with a Butterworth magnitude response, applied block by block.
+
+    Each FFT block overlaps its neighbours by a few cutoff periods and only its middle is kept,
+    so the cost is linear in the length of the series and memory is bounded by the block size.
+    """
+    n = len(values)
+    pad = int(np.ceil(LOWPASS_SETTLE_PERIODS * fs / cutoff_hz))
+    nfft = LOWPASS_BLOCK
+    while nfft < 4 * pad:
+        nfft *= 2
+    body = nfft - 2 * pad
+
+    gain = 1 / np.sqrt(1 + (np.fft.rfftfreq(nfft, 1 / fs) / cutoff_hz) ** (2 * order))
+    # Point-mirrored ends keep the filter from ringing against an artificial step at the edges
+    padded = np.pad(values, pad, mode="reflect", reflect_type="odd") if n > pad else np.pad(values, pad, mode="edge")
+
+    out = np.empty(n)
+    for i in range(0, n, body):
+        segment = padded[i : i + nfft]
+        filtered = np.fft.irfft(np.fft.rfft(segment, nfft) * gain, nfft)
+        out[i : i + body] = filtered[pad : pad + min(body, n - i)]
+    return out
+
+
+def ApplyFilter(spec: dict, values: np.ndarray, times_ns: np.ndarray):
+    """One filter from SENSOR_FILTERS: returns (trace label suffix, filtered values, derivative?)."""
+    span_s = (times_ns[-1] - times_ns[0]) / 1e9
+    fs = (len(values) - 1) / span_s if span_s > 0 else 1.0
+    kind = spec["kind"]
+
+    if kind == "rolling_mean":
+        window = max(1, round(spec["window_s"] * fs))
+        return f"mean {spec['window_s'] * 1e3:g} ms", RollingMean(values, window), False
+    if kind == "rolling_median":
+        window = max(1, round(spec["window_s"] * fs))
+        return f"median {spec['window_s'] * 1e3:g} ms", RollingMedian(values, window), False
+    if kind == "lowpass":
+        order = spec.get("order", 4)
+        return f"low-pass {spec['cutoff_hz']:g} Hz", LowPass(values, fs, spec["cutoff_hz"], order), False
+    if kind == "derivative":
+        label = "d/dt"
+        if spec.get("cutoff_hz"):
+            values = LowPass(values, fs, spec["cutoff_hz"], spec.get("order", 4))
+            label = f"d/dt, low-pass {spec['cutoff_hz']:g} Hz"
+        return label, np.gradient(values, (times_ns - times_ns[0]) / 1e9), True
+    raise ValueError(f"Unknown filter kind {kind!r}")
+
+
+def _ColumnValues(column: pd.Series) -> np.ndarray:
+    if pd.api.types.is_float_dtype(column.dtype):
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def SensorSamples(sensor: dict, column: pd.Series, digital: bool | None = None) -> dict | None:
+    """NaN-free samples of one sensor with their run starts and digital classification (None if empty).
+
+    digital: the classification from an earlier pass over the same column, so it is not repeated.
+    """
+    y = _ColumnValues(column)
+    valid_idx = np.flatnonzero(~np.isnan(y))
+    if len(valid_idx) == 0:
+        return None
+
+    present = y[valid_idx]
+    starts = RunStarts(present)
+    return {
+        "y": y,
+        "valid_idx": valid_idx,
+        "present": present,
+        "starts": starts,
+        "digital": IsDigitalChannel(sensor["column"], present, starts) if digital is None else digital,
+    }
+
+
+def SensorsWithUnits(sensors: list, summary: dict | None) -> list:
+    """Copies of the sensor entries carrying the calibration "unit" recorded for them in the summary."""
+    channel_summaries = summary["channels"] if summary else {}
+    return [
+        dict(sensor, unit=channel_summaries[sensor["column"]]["unit"])
+        if "unit" in channel_summaries.get(sensor["column"], {}) else sensor
+        for sensor in sensors
+    ]
+
+
+def _UnitSuffix(label: str) -> str:
+    return re.search(r"(\[[^\]]+\]|\([^)]+\))\s*$", label).group(1)
+
+
+def AxisLabel(y_axis_key: str, sensors: list) -> str:
+    """Title of one y axis, in the calibrated units of the sensors drawn on it when they have any."""
+    label = Y_AXIS_LABELS.get(y_axis_key, y_axis_key)
+    units = {sensor.get("unit") for sensor in sensors if sensor.get("yaxis", "y1").lower() == y_axis_key}
+    if units <= {None}:
+        return label
+    raw_unit = _UnitSuffix(label)[1:-1]
+    name = CALIBRATED_AXIS_NAMES.get(y_axis_key, label[: -len(_UnitSuffix(label))].strip())
+    return f"{name} [{', '.join(sorted(unit or raw_unit for unit in units))}]"
+
+
+def BuildSensorTraces(
+    sensor: dict,
+    index_values: np.ndarray,
+    column: pd.Series,
+    t0: pd.Timestamp | None,
+    max_points: int = MAX_POINTS_PER_TRACE,
+    digital: bool | None = None,
+) -> list:
+    """Extract, thin and package one sensor as plain trace dicts: the raw trace followed by
+    one per configured filter (empty if the sensor has no data).
+
+    digital: the column's classification, if the caller already has it.
+    Only NumPy work happens here, so several sensors can run at once on a thread pool.
+    """
+    samples = SensorSamples(sensor, column, digital)
+    if samples is None:
+        return []
+
+    y, valid_idx, present = samples["y"], samples["valid_idx"], samples["present"]
+    starts, digital = samples["starts"], samples["digital"]
+    if digital:
+        # One point per state change, drawn as steps: every edge lands at its exact sample time
+        keep = starts
+    else:
+        # Thin the index list first so only the kept points are ever gathered
+        keep = _thin_indices(len(valid_idx), max_points)
+    idx = valid_idx[keep]
+    x_vals, y_vals = index_values[idx], y[idx]
+    if t0 is not None:
+        x_vals = RelativeSeconds(x_vals, t0)
+
+    y_axis_key = sensor.get("yaxis", "y1").lower()
+    unit_name = f"[{sensor['unit']}]" if "unit" in sensor else _UnitSuffix(Y_AXIS_LABELS[y_axis_key])
+    name = sensor.get("name", sensor["column"])
+
+    traces = [
+        dict(
+            type="scatter",
+            x=x_vals,
+            y=y_vals,
+            mode="lines",
+            name=name,
+            line=dict(color=sensor.get("color"), shape="hv") if digital else dict(color=sensor.get("color")),
+            yaxis="y" if y_axis_key == "y1" else y_axis_key,
+            visible=True,
+            hovertemplate=f"%{{y:.2f}} {unit_name}",
+        )
+    ]
+
+    # Filtering a state channel would only blur its edges
+    if digital or len(present) < 3:
+        return traces
+
+    times_ns = index_values[valid_idx].astype("datetime64[ns]").astype(np.int64)
+    for spec in sensor.get("filters", []):
+        label, filtered, derivative = ApplyFilter(spec, present, times_ns)
+        filter_axis = spec.get("yaxis", "y7" if derivative else y_axis_key)
+        filter_unit = f"{unit_name[:-1]}/s{unit_name[-1]}" if derivative else unit_name
+        traces.append(
+            dict(
+                type="scatter",
+                x=x_vals,
+                y=filtered[keep],
+                mode="lines",
+                name=f"{name} ({label})",
+                line=dict(color=sensor.get("color"), dash="dash"),
+                yaxis="y" if filter_axis == "y1" else filter_axis,
+                visible=True,
+                hovertemplate=f"%{{y:.2f}} {filter_unit}",
+            )
+        )
+    return traces
+
+
+PLOTLY_TYPED_ARRAY_DTYPES = {"f8", "f4", "i4", "u4", "i2", "u2", "i1", "u1"}
+
+
+def _TypedArraySpec(values):
+    """Numeric arrays as plotly.js typed-array specs ({dtype, bdata}); anything else unchanged.
+
+    This is the encoding plotly.py applies during validation, needed when validation is skipped.
+    """
+    if not isinstance(values, np.ndarray):
+        return values
+    dtype = f"{values.dtype.kind}{values.dtype.itemsize}"
+    if dtype not in PLOTLY_TYPED_ARRAY_DTYPES:
+        return values
+    data = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    return {"dtype": dtype, "bdata": base64.b64encode(data).decode("ascii")}
+
+
+# --point-budget: points for the whole figure, split across traces by how much of their axis they travel
+POINT_BUDGET_MIN_PER_TRACE = 2_000
+# Activity is measured on this many bucket means, so sensor noise averages out and plot-scale movement remains
+POINT_ACTIVITY_BUCKETS = 8192
+
+
+def SignalActivity(samples: dict | None) -> dict | None:
+    """What a sensor needs from the point budget: exact transitions if digital, else the total
+    variation of its bucket means. samples comes from SensorSamples."""
+    if samples is None:
+        return None
+
+    present = samples["present"]
+    if samples["digital"]:
+        return {"n": len(present), "digital": True, "points": len(samples["starts"])}
+    per_bucket = len(present) // POINT_ACTIVITY_BUCKETS
+    if per_bucket > 1:
+        buckets = present[: per_bucket * POINT_ACTIVITY_BUCKETS].reshape(-1, per_bucket)
+        means = buckets.mean(axis=1)
+        # White noise alone would still move the means by about 1.128 * sigma / sqrt(per_bucket) a step
+        noise_step = 1.128 * buckets.std(axis=1).mean() / np.sqrt(per_bucket)
+    else:
+        means, noise_step = present, 0.0
+    variation = max(float(np.abs(np.diff(means)).sum()) - noise_step * (len(means) - 1), 0.0)
+    return {
+        "n": len(present),
+        "digital": False,
+        "variation": variation,
+        "low": float(present.min()),
+        "high": float(present.max()),
+    }
+
+
+def AllocatePoints(budget: float, demands: np.ndarray, weights: np.ndarray, costs: np.ndarray, minimum: int):
+    """Water-fill a budget across traces in proportion to weights.
+
+    Every trace gets at least minimum points and never more than its demand (its sample count);
+    budget left over by capped traces goes to the rest. costs[i] is what one point of trace i
+    spends (a sensor's filter traces are thinned with it).
+    """
+    points = np.minimum(demands, minimum).astype(np.float64)
+    remaining = budget - (points * costs).sum()
+    uncapped = points < demands
+
+    while remaining > 0 and uncapped.any():
+        share = np.where(uncapped, weights, 0.0)
+        if share.sum() <= 0:
+            share = uncapped.astype(np.float64)
+        grant = np.minimum(remaining * share / share.sum() / costs, demands - points)
+        points += grant
+        remaining -= (grant * costs).sum()
+
+        newly_capped = uncapped & (points >= demands)
+        uncapped &= ~newly_capped
+        if not newly_capped.any():
+            break
+
+    return np.floor(points).astype(int)
+
+
+def PointBudget(sensors: list, activities: list, budget: int, minimum: int = POINT_BUDGET_MIN_PER_TRACE) -> list:
+    """Points per trace for each sensor under a figure-wide budget.
+
+    Digital sensors keep every transition and are paid for first. The rest share what is left by
+    total variation measured in heights of their y axis, so a flat bottle pressure on the shared
+    pressure axis gets few points and a chamber PT gets many.
+    """
+    fixed = sum(a["points"] for a in activities if a and a["digital"])
+    analog = [i for i, a in enumerate(activities) if a and not a["digital"]]
+
+    spans = {}
+    for i in analog:
+        axis = sensors[i].get("yaxis", "y1").lower()
+        low, high = spans.get(axis, (activities[i]["low"], activities[i]["high"]))
+        spans[axis] = (min(low, activities[i]["low"]), max(high, activities[i]["high"]))
+
+    demands = np.array([activities[i]["n"] for i in analog], dtype=np.float64)
+    costs = np.array([1 + len(sensors[i].get("filters", [])) for i in analog], dtype=np.float64)
+    weights = np.array(
+        [
+            activities[i]["variation"] / max(np.subtract(*spans[sensors[i].get("yaxis", "y1").lower()][::-1]), 1e-12)
+            for i in analog
+        ]
+    )
+
+    points = AllocatePoints(max(budget - fixed, 0), demands, weights, costs, minimum)
+    total = fixed + int((points * costs).sum())
+    if total > budget:
+        print(f"  Point budget {budget:,} is below the per-trace minimum; using {total:,}")
+    else:
+        print(f"  Point budget: {total:,} of {budget:,} points ({fixed:,} for state transitions)")
+
+    max_points = [MAX_POINTS_PER_TRACE] * len(sensors)
+    for i, n_points in zip(analog, points):
+        max_points[i] = int(n_points)
+    return max_points
+
+
+def BuildTraces(
+    df: pd.DataFrame,
+    sensors: list,
+    t0: pd.Timestamp | None,
+    workers: int | None = None,
+    point_budget: int | None = None,
+) -> list:
+    """Trace dicts for every sensor present in df, built in parallel and returned in sensor order.
+
+    point_budget replaces the fixed MAX_POINTS_PER_TRACE with a figure-wide total (see PointBudget).
+    """
+    index_values = df.index.values  # datetime64 in UTC, not an object array of Timestamps
+    present = []
+    for sensor in sensors:
+        if sensor["column"] not in df.columns:
+            print(f"Warning: Column '{sensor['column']}' not found; skipping.")
+            continue
+        present.append(sensor)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if point_budget is not None:
+            # Only each sensor's activity outlives the budget pass, so the full samples of every channel are
+            # never held at once; its digital classification is kept so the trace pass does not repeat it
+            activities = list(
+                pool.map(lambda sensor: SignalActivity(SensorSamples(sensor, df[sensor["column"]])), present)
+            )
+            max_points = PointBudget(present, activities, point_budget)
+            digital = [activity["digital"] if activity else None for activity in activities]
+        else:
+            max_points = [MAX_POINTS_PER_TRACE] * len(present)
+            digital = [None] * len(present)
+
+        built = pool.map(
+            lambda sensor, n_points, is_digital: BuildSensorTraces(
+                sensor, index_values, df[sensor["column"]], t0, n_points, is_digital
+            ),
+            present,
+            max_points,
+            digital,
+        )
+        traces = [trace for sensor_traces in built for trace in sensor_traces]
+
+    for trace in traces:
+        kind = ", state transitions" if trace["line"].get("shape") == "hv" else ""
+        print(f"  Added trace: {trace['name']} ({len(trace['y'])} points{kind})")
+    return traces
 
 
 
@@ -556,62 +1722,196 @@ def _thin(x, y, maxn):
 
 
 
-def PlotParquet(parquet_path: str, html_out: str, start: str | None, end: str | None):
-    pio.templates.default = THEME
+def CachePath(parquet_path: str) -> str:
+    return f"{os.path.splitext(parquet_path)[0]}.arrow"
+
+
+def WriteArrowCache(df: pd.DataFrame, cache_path: str):
+    """Save the cleaned, sorted frame as uncompressed Arrow IPC (Feather v2) for memory mapping."""
+    # Build the columns from numpy directly so NaN stays NaN instead of becoming a null bitmap;
+    # that keeps the float columns zero-copy when they are mapped back in.
+    columns = {"timestamp": pa.array(df.index)}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        columns[column] = pa.array(values, from_pandas=values.dtype == object)
+    table = pa.table(columns)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    # One record batch, so every column maps back as a single contiguous buffer (see ReadArrowCache)
+    feather.write_feather(table, tmp_path, compression="uncompressed", chunksize=max(len(df), 1))
+    os.replace(tmp_path, cache_path)
+    print(f"Saved arrow cache to {cache_path}")
+
+
+def ReadArrowCache(cache_path: str) -> pd.DataFrame | None:
+    """Frame whose columns are views into the memory-mapped cache; None for a cache that is not one batch.
+
+    Nothing is copied into the Arrow memory pool, so the OS page cache is shared by every process reading the file.
+    """
+    reader = pa.ipc.open_file(pa.memory_map(cache_path, "r"))
+    if reader.num_record_batches != 1:
+        return None  # written by an older version in 64K-row chunks; joining them would copy everything
+
+    batch = reader.get_batch(0)
+    # Each array keeps a reference to the mapped buffer, which keeps the mapping alive
+    arrays = {name: column.to_numpy(zero_copy_only=False) for name, column in zip(batch.schema.names, batch.columns)}
+    index = pd.DatetimeIndex(arrays.pop("timestamp"), name="timestamp")
+    index = index.tz_localize("UTC") if index.tz is None else index
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def ParquetLayout(schema: pa.Schema) -> dict:
+    """Layout tag the converter stored in the schema metadata ({} for parquet from elsewhere)."""
+    raw = (schema.metadata or {}).get(PARQUET_LAYOUT_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def ReadParquetFrame(parquet_path: str, trust_layout: bool = True) -> pd.DataFrame:
+    """Timestamp-indexed, sorted frame straight from the parquet.
+
+    Converter output is tagged as sorted with null-free UTC timestamps. For those files each row
+    group is decoded straight into preallocated NumPy arrays that the frame wraps without copying,
+    so peak memory is the frame plus one row group. Any other file gets the full clean-up.
+    """
+    parquet_file = pq.ParquetFile(parquet_path)
+    schema = parquet_file.schema_arrow
+    time_type = schema.field("timestamp").type
+    channel_types = [field.type for field in schema if field.name != "timestamp"]
+
+    if not (
+        trust_layout
+        and ParquetLayout(schema).get("sorted_by") == "timestamp"
+        and pa.types.is_timestamp(time_type)
+        and time_type.tz == "UTC"
+        and all(pa.types.is_floating(t) for t in channel_types)
+    ):
+        df = parquet_file.read().to_pandas()
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
+        return df.dropna(subset=["timestamp"]).set_index("timestamp").sort_index()
+
+    n_rows = parquet_file.metadata.num_rows
+    arrays = {
+        field.name: np.empty(n_rows, dtype=f"datetime64[{time_type.unit}]" if field.name == "timestamp" else field.type.to_pandas_dtype())
+        for field in schema
+    }
+    offset = 0
+    for rg_index in range(parquet_file.num_row_groups):
+        row_group = parquet_file.read_row_group(rg_index)
+        for name, column in zip(row_group.column_names, row_group.columns):
+            # Nulls come out as NaN here; null-free chunks are copied straight from the decode buffer
+            arrays[name][offset : offset + row_group.num_rows] = column.to_numpy()
+        offset += row_group.num_rows
+
+    index = pd.DatetimeIndex(arrays.pop("timestamp"), name="timestamp").tz_localize("UTC")
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def LoadPlotFrame(parquet_path: str, use_cache: bool = False) -> pd.DataFrame:
+    """Load a converted test as a timestamp-indexed, sorted frame, optionally through the arrow cache."""
+    cache_path = CachePath(parquet_path)
+
+    if (
+        use_cache
+        and os.path.exists(cache_path)
+        and os.path.getmtime(cache_path) >= os.path.getmtime(parquet_path)
+    ):
+        print(f"Loading cached arrow file {cache_path}...")
+        df = ReadArrowCache(cache_path)
+        if df is not None:
+            return df
+        print(f"Arrow cache {cache_path} is in the old chunked layout; rebuilding it")
+
     print("Loading parquet file...")
-    df = pd.read_parquet(parquet_path)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-    df = df.dropna(subset=["timestamp"]).set_index("timestamp").sort_index()
+    df = ReadParquetFrame(parquet_path)
 
-    if start or end:
-        df = df.loc[start:end]
+    if use_cache:
+        WriteArrowCache(df, cache_path)
 
-    print(f"Plotting data: {len(df)} rows, {len(df.columns)} columns")
-    fig = go.Figure()
-    used_axes = []
-    traces_added = 0
+    return df
 
-    for sensor in SENSORS_TO_PLOT:
-        column = sensor["column"]
-        if column not in df.columns:
-            print(f"Warning: Column '{sensor_name}' not found; skipping.")
 
+def DetectEvent(df: pd.DataFrame) -> pd.Timestamp | None:
+    """First time EVENT_SENSOR rises past EVENT_THRESHOLD_FRACTION of its min→max range."""
+    if EVENT_SENSOR not in df.columns:
+        return None
 
-        y = pd.to_numeric(df[column], errors="coerce")
-        mask = y.notna()
+    y = pd.to_numeric(df[EVENT_SENSOR], errors="coerce").dropna()
+    if y.empty or y.max() == y.min():
+        return None
 
-        if not mask.any():
-            continue
+    threshold = y.min() + EVENT_THRESHOLD_FRACTION * (y.max() - y.min())
+    return y.index[np.argmax(y.to_numpy() >= threshold)]
 
-        x_vals, y_vals = _thin(df.index[mask], y[mask], MAX_POINTS_PER_TRACE)
-        y_axis_key = sensor.get("yaxis", "y1").lower()
 
-        if y_axis_key not in used_axes:
-            used_axes.append(y_axis_key)
+def UtcTimestamp(value) -> pd.Timestamp:
+    """--start/--end style value as a tz-aware UTC timestamp (naive values are taken as UTC)."""
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
 
 
-        unit_name = re.search(r"(\[[^\]]+\]|\([^)]+\))\s*$", Y_AXIS_LABELS[y_axis_key]).group(1)
-    
-            
-        fig.add_trace(
-            go.Scatter(
-                x=x_vals,
-                y=y_vals,
-                mode="lines",
-                name=sensor.get("name", column),
-                line=dict(color=sensor.get("color")),
-                yaxis=y_axis_key,
-                visible=True,
-                hovertemplate=f"%{{y:.2f}} {unit_name}",
-            )
-        )
-        traces_added += 1
-        print(f"  Added trace: {sensor.get('name', column)} ({len(y_vals)} points)")
+def ReferenceTime(df: pd.DataFrame, mode: str, start: str | None) -> pd.Timestamp:
+    """T-0 for a relative time axis: 'file' start, the --start instant, or a detected 'event'."""
+    if mode == "start" and start:
+        return UtcTimestamp(start)
+
+    if mode == "event":
+        event_time = DetectEvent(df)
+        if event_time is not None:
+            print(f"Detected event on {EVENT_SENSOR} at {event_time}")
+            return event_time
+        print(f"Warning: no event found on {EVENT_SENSOR}; using file start as T-0")
+
+    return df.index[0]
+
+
+def RelativeSeconds(x_vals: np.ndarray, t0: pd.Timestamp) -> np.ndarray:
+    offsets = (x_vals.astype("datetime64[ns]").astype(np.int64) - t0.as_unit("ns").value) / 1e9
+    max_offset = np.abs(offsets).max(initial=0.0)
+    if max_offset * np.finfo(np.float32).eps <= RELATIVE_TIME_RESOLUTION_S:
+        return offsets.astype(np.float32)
+    return offsets
+
+
+def _layout_axis_key(k):
+    return "yaxis" if k.lower() == "y1" else f"yaxis{int(k[1:])}"
+
+
+def FigureFromFrame(
+    df: pd.DataFrame,
+    title: str,
+    t0: pd.Timestamp | None = None,
+    summary: dict | None = None,
+    sensors: list | None = None,
+    workers: int | None = None,
+    validate_figure: bool = True,
+    point_budget: int | None = None,
+    traces: list | None = None,
+):
+    """Build the plot for an already loaded and windowed frame.
+
+    Returns a go.Figure, or with validate_figure=False the equivalent plain dict
+    (numeric arrays as typed-array specs) ready for pio.write_html(validate=False).
+    traces: trace dicts already built by BuildTraces, so several figures can share one thinning pass.
+    """
+    sensors = SensorsWithUnits(SENSORS_TO_PLOT if sensors is None else sensors, summary)
+
+    print(f"Plotting data: {len(df)} rows, {len(df.columns)} columns")
+    fig = go.Figure()
+    if traces is None:
+        traces = BuildTraces(df, sensors, t0, workers, point_budget)
+    traces_added = len(traces)
+    used_axes = []
+    for trace in traces:
+        y_axis_key = "y1" if trace["yaxis"] == "y" else trace["yaxis"]
+        if y_axis_key not in used_axes:
+            used_axes.append(y_axis_key)
 
+    if validate_figure:
+        fig.add_traces([go.Scatter(**{k: v for k, v in trace.items() if k != "type"}) for trace in traces])
 
     fig.update_layout(
         
-        title=f"{Path(parquet_path).name}",
+        title=title,
 
         yaxis=dict(title="Pressure [psia]", visible=True),
 
@@ -624,7 +1924,7 @@ def PlotParquet(parquet_path: str, html_out: str, start: str | None, end: str |
                     side="right", position=0.95,
                     visible=True),
 
-        yaxis4=dict(title="RTD Voltage (V)",
+        yaxis4=dict(title=AxisLabel("y4", sensors),
                     anchor="free", overlaying="y",
                     side="right", position=0.90,
                     visible=True),
@@ -639,378 +1939,337 @@ def PlotParquet(parquet_path: str, html_out: str, start: str | None, end: str |
             dict(
                 type="buttons",
                 showactive=False,
-                buttons=[
-                    dict(
-                        label="Toggle OX",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_ox",
-                    ),
-                    dict(
-                        label="Toggle FU",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_fu",
-                    ),
-                    dict(
-                        label="Toggle HE",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_he",
-                    ),
-                    dict(
-                        label="Toggle PT",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_pt",
-                    ),
-                    dict(
-                        label="Toggle TC",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_tc",
-                    ),
-                    dict(
-                        label="Toggle RTD",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_rtd",
-                    ),
-                    dict(
-                        label="Toggle PI",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_pi",
-                    ),
-                    dict(
-                        label="Toggle FMS",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_fms",
-                    ),
-                    dict(
-                        label="Show ALL",
-                        method="update",
-                        args=[{}, {}],
-                        name="btn_all",
-                    ),
-                ],
+                buttons=ToggleButtons([trace["name"] for trace in traces]),
                 direction="down",
                 pad=dict(r=10, t=10),
                 bgcolor="#333",
                 font=dict(color="white"),
             )
-        ]
-    )
-
-    def _layout_axis_key(k):
-        return "yaxis" if k.lower() == "y1" else f"yaxis{int(k[1:])}"
+        ],
 
+        # Trace index -> layout axis key, so the toggle script never has to work it out
+        meta=dict(trace_axes=[TraceAxisKey(trace["yaxis"]) for trace in traces]),
+    )
 
-    def export_plot_with_dynamic_buttons(fig, path, div_id="my_fig"):
-        """Export Plotly HTML with JS that adds dynamic group toggling."""
+    if summary:
+        quality_shapes = QualityShapes(summary.get("quality", []), df.index, t0)
+        if quality_shapes:
+            fig.update_layout(shapes=list(fig.layout.shapes) + quality_shapes)
+            print(f"  Marked {len(quality_shapes)} data-quality flags")
 
-        # Step 1 — save HTML normally
-        fig.write_html(path,
-                       include_plotlyjs="cdn",
-                       full_html=True,
-                       div_id=div_id)
+    if traces_added == 0:
+        print("WARNING: No traces were added to the plot!")
+        print(f"Available columns in data: {list(df.columns)}")
+        print(f"Requested sensors: {[s['column'] for s in sensors]}")
 
+    if t0 is not None:
+        fig.update_layout(
+            xaxis=dict(title=f"{RELATIVE_X_AXIS_LABEL}, T-0 = {t0.isoformat()}"),
+            hovermode="x unified",
+        )
+        fig.add_vline(x=0, line=dict(color="#888", dash="dot"))
+    else:
+        fig.update_layout(xaxis=dict(title=X_AXIS_LABEL), hovermode="x unified")
+    used_axes.sort(key=lambda a: int(a[1:]) if a[1:].isdigit() else 1)
 
-        # Step 2 — JavaScript code for real-time group toggle
-        js_code = """
-                <script>
-                (function(){
-                    function toggleGroup(tag) {
-                    const gd = document.getElementById("my_fig");
-                    if (!gd) return;
+    step = 0.14 / max(1, len(used_axes) - 1) if len(used_axes) > 1 else 0
 
-                    const data = gd.data;
+    for i, y_axis_key in enumerate(used_axes):
 
-                    // Determine which traces belong to this group
-                    const groupIdx = [];
-                    for (let i = 0; i < data.length; i++) {
-                        if (data[i].name && data[i].name.includes(tag)) {
-                            groupIdx.push(i);
-                        }
-                    }
+        y_axis_label = AxisLabel(y_axis_key, [sensor for sensor in sensors if sensor["column"] in df.columns])
+        if y_axis_key == "y1":
+            dictionary = dict(title=dict(text=y_axis_label),
+                              side="left",
+                              position=0.0,
+                              showgrid=True)
+        else:
+            side = "right" if i % 2 else "left"
+            pos = (1 - (i // 2) * step) if side == "right" else ((i // 2 + 1) * step)
+            pos = max(0.02, min(0.98, pos))
+            dictionary = dict(
+                title=dict(text=y_axis_label),
+                overlaying="y",
+                side=side,
+                position=pos,
+                showgrid=False,
+            )
 
-                    if (tag === "ALL") {
-                        // Show everything
-                        Plotly.restyle(gd, {visible: true});
-                        return;
-                    }
+        layout_key = _layout_axis_key(y_axis_key)
+        fig.update_layout(**{layout_key: dictionary})
 
-                    // Get current group visibility (treat undefined as visible)
-                    const groupVis = groupIdx.map(i =>
-                        (data[i].visible === undefined || data[i].visible)
-                    );
+    if validate_figure:
+        return fig
+
+    raw_traces = [dict(trace, x=_TypedArraySpec(trace["x"]), y=_TypedArraySpec(trace["y"])) for trace in traces]
+    return dict(fig.to_plotly_json(), data=raw_traces)
+
+
+def export_plot_with_dynamic_buttons(
+    figure,
+    path,
+    summary=None,
+    div_id="my_fig",
+    extra_html="",
+    instrument=False,
+    header_html="",
+    sync_key=None,
+    plotlyjs="cdn",
+):
+    """Export Plotly HTML with JS that adds dynamic group toggling.
+
+    figure is a go.Figure, or the plain dict FigureFromFrame returns when validation is skipped.
+    extra_html is inserted after the plot (links to companion pages etc.), header_html above it.
+    instrument adds render timings (Plotly.newPlot, toggles, theme switch, color panel) in an overlay.
+    sync_key keeps the x range in step with every other page exported with the same key.
+    plotlyjs is "cdn" or the path of a local plotly.js relative to the page (see PlotlyJsSource).
+    """
+
+    # Step 1 — save HTML normally
+    pio.write_html(figure,
+                   path,
+                   validate=isinstance(figure, go.Figure),
+                   include_plotlyjs=plotlyjs,
+                   full_html=True,
+                   div_id=div_id)
+
+
+    # Step 2 — JavaScript code for real-time group toggle
+    js_code = """
+            <script>
+            (function(){
+                const gd = document.getElementById("my_fig");
+                if (!gd) {
+                    console.warn("toggleGroup: plot div not found (#my_fig)");
+                    return;
+                }
 
-                    // If ANY are visible → turn ALL off
-                    // If ALL are hidden → turn ALL on
-                    const target = groupVis.some(v => v) ? false : true;
+                // Trace index -> layout axis key, precomputed in Python
+                const traceAxes = (gd.layout.meta || {}).trace_axes || [];
 
-                    // Build final visibility array
-                    let vis = data.map(t => t.visible === "legendonly" ? false : t.visible !== false);
+                // Count redraws so the cost of a click is visible in the console
+                let redraws = 0;
+                gd.on("plotly_afterplot", () => { redraws++; });
 
-                    for (const idx of groupIdx) {
-                        vis[idx] = target;
-                    }
+                function currentVisibility() {
+                    return gd.data.map(t => t.visible === undefined ? true : t.visible);
+                }
 
-                    Plotly.restyle(gd, {visible: vis});
-                    }
+                // Layout update that shows exactly the y axes with a visible trace on them
+                function axisVisibility(vis) {
+                    const used = {};
+                    vis.forEach((v, i) => { if (v === true) used[traceAxes[i]] = true; });
 
+                    const update = {};
+                    Object.keys(gd.layout).forEach(key => {
+                        if (/^yaxis\\d*$/.test(key)) update[key + ".visible"] = !!used[key];
+                    });
+                    return update;
+                }
 
-                    // Helper: find a descendant element whose trimmed textContent equals label
-                    function findElementByExactText(root, label) {
-                        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, null, false);
-                        let node;
-                        while (node = walker.nextNode()) {
-                            const txt = (node.textContent || "").trim();
-                            if (txt === label) return node;
-                        }
-                        return null;
-                    }
+                function toggleGroup(traces, showAll) {
+                    const vis = currentVisibility();
 
-                    // Attach handlers once the buttons exist. Use MutationObserver to detect rendering.
-                    function attachWhenReady() {
-                    const gd = document.getElementById("my_fig");
-                    if (!gd) {
-                        console.warn("toggleGroup: plot div not found (#my_fig)");
-                        return;
+                    // If ANY are visible → turn ALL off
+                    // If ALL are hidden → turn ALL on
+                    const target = showAll || !traces.some(i => vis[i] === true);
+                    for (const idx of traces) {
+                        vis[idx] = target;
                     }
 
-                    const labels = [
-                        "Toggle OX",
-                        "Toggle FU",
-                        "Toggle HE",
-                        "Toggle PT",
-                        "Toggle TC",
-                        "Toggle RTD",
-                        "Toggle PI",
-                        "Toggle FMS",
-                        "Show ALL",
-                    ];
-
-                    const handlers = [
-                        () => toggleGroup("-OX"),
-                        () => toggleGroup("-FU"),
-                        () => toggleGroup("-HE"),
-                        () => toggleGroup("PT-"),
-                        () => toggleGroup("TC-"),
-                        () => toggleGroup("RTD-"),
-                        () => toggleGroup("PI-"),
-                        () => toggleGroup("FMS"),
-                        () => toggleGroup("ALL"),
-                    ];
-
-                    let attached = 0;
-                    const timeoutAt = Date.now() + 3000; // try up to 3s
-
-                    const tryAttach = () => {
-                        for (let i = 0; i < labels.length; i++) {
-                            const label = labels[i];
-                            const el = findElementByExactText(gd, label);
-                            if (el && !el.__toggle_attached) {
-                                el.addEventListener("click", handlers[i]);
-                                el.__toggle_attached = true;
-                                attached++;
-                                console.log("toggleGroup: attached handler to button:", label, el);
-                            }
-                        }
-                        if (attached === labels.length) {
-                            console.log("toggleGroup: all handlers attached");
-                            observer.disconnect();
-                            return;
-                        }
-                        if (Date.now() > timeoutAt) {
-                            console.warn("toggleGroup: timed out waiting for buttons; attached:", attached);
-                            observer.disconnect();
-                        }
-                    };
-
-                    // Try immediately in case elements are already present
-                    tryAttach();
-
-                    // Observe DOM changes to catch the buttons when Plotly renders them
-                    const observer = new MutationObserver(() => {
-                        tryAttach();
+                    // Trace and axis visibility in one redraw
+                    const before = redraws;
+                    const span = window.plotPerf && plotPerf.begin("toggle");
+                    Plotly.update(gd, {visible: vis}, axisVisibility(vis)).then(() => {
+                        if (span) span.end();
+                        console.log("toggleGroup: redraws for this click:", redraws - before);
                     });
-                    observer.observe(gd, { childList: true, subtree: true });
                 }
 
-                if (document.readyState === "complete" || document.readyState === "interactive") {
-                    setTimeout(attachWhenReady, 50);
-                } else {
-                    window.addEventListener("DOMContentLoaded", () => setTimeout(attachWhenReady, 50));
-                }
-                })();
-                </script>
-                """
-
-        hide_unused_axis_js = """
-        <script>
-        document.addEventListener('DOMContentLoaded', () => {
-            const graph = document.getElementById('my_fig');
-            if (!graph) return;
-
-            // --- ADD THIS THROTTLE FUNCTION ---
-            function throttle(fn, wait) {
-                let last = 0;
-                return function(...args) {
-                    const now = Date.now();
-                    if (now - last >= wait) {
-                        last = now;
-                        fn.apply(this, args);
-                    }
-                };
-            }
-
-            // --- MOVE YOUR HIDE FUNCTION INTO ITS OWN WRAPPER ---
-            function hideUnusedAxes() {
-                const gd = graph._fullLayout;
-                const data = graph.data;
-
-                const axesUsed = {};
-
-                data.forEach(trace => {
-                    const isVisible = !(trace.visible === false || trace.visible === "legendonly");
-                    // Convert trace.yaxis ("y", "y2", ...) into layout key ("yaxis", "yaxis2", ...)
-                    let axis = trace.yaxis || 'y';
-                    if (axis === 'y') {
-                        axis = 'yaxis';
-                    } else {
-                        axis = axis.replace('y', 'yaxis');
-                    }
+                gd.on("plotly_buttonclicked", event => {
+                    const group = event.button.args[0];
+                    toggleGroup(group.traces, group.show_all);
+                });
 
-                    if (isVisible) axesUsed[axis] = true;
+                // Legend clicks restyle single traces; follow up only if an axis actually changes
+                gd.on("plotly_restyle", () => {
+                    const wanted = axisVisibility(currentVisibility());
+                    const changed = {};
+                    Object.keys(wanted).forEach(key => {
+                        const axis = gd.layout[key.replace(".visible", "")];
+                        if ((axis.visible !== false) !== wanted[key]) changed[key] = wanted[key];
+                    });
+                    if (Object.keys(changed).length) Plotly.relayout(gd, changed);
                 });
+            })();
+            </script>
+            """
+
+    theme_toggle_js = """
+    <script>
+    (function() {
+        const btn = document.createElement("input");
+        btn.type = "checkbox";
+        btn.id = "themeToggle";
+        btn.style.position = "fixed";
+        btn.style.top = "10px";
+        btn.style.left = "10px";
+        btn.style.zIndex = "9999";
+        btn.title = "Toggle Dark Mode";
+
+        const lbl = document.createElement("label");
+        lbl.htmlFor = "themeToggle";
+        lbl.innerText = "🌞/🌙";
+        lbl.style.position = "fixed";
+        lbl.style.top = "12px";
+        lbl.style.left = "40px";
+        lbl.style.color = "black";
+        lbl.style.fontFamily = "sans-serif";
+        lbl.style.fontSize = "25px";
+        lbl.style.cursor = "pointer";
+        lbl.style.zIndex = "9999";
+
+        document.body.appendChild(lbl);
+        document.body.appendChild(btn);
+
+        btn.addEventListener("change", () => {
+            const gd = document.getElementById("my_fig");
+            if (!gd) return;
 
-                const update = {};
+            const isDark = btn.checked;
+            const newTemplate = isDark ? "plotly_dark" : "plotly_white";
 
-            ['yaxis', 'yaxis2', 'yaxis3', 'yaxis4', 'yaxis5'].forEach(key => {
-                if (gd[key]) {
-                    update[key + '.visible'] = !!axesUsed[key];
-                }
-            });
+            const layoutUpdate = {
+                template: newTemplate,
+                paper_bgcolor: isDark ? "#111" : "#fff",
+                plot_bgcolor: isDark ? "#111" : "#fff",
+                font: { color: isDark ? "#eee" : "#000" },
+            };
 
-                Plotly.relayout(graph, update);
-            }
+            console.log("Switching theme to:", newTemplate);
+            const span = window.plotPerf && plotPerf.begin("theme");
+            Plotly.react(gd, gd.data, Object.assign({}, gd.layout, layoutUpdate)).then(() => {
+                if (span) span.end();
+            });
 
-            // --- REPLACE YOUR ORIGINAL LISTENER WITH THROTTLED VERSION ---
-            graph.on('plotly_restyle', throttle(hideUnusedAxes, 150));
+            // Change page background and label color too
+            document.body.style.backgroundColor = layoutUpdate.paper_bgcolor;
+            lbl.style.color = layoutUpdate.font.color;
         });
-        </script>
-        """
-
-
-        theme_toggle_js = """
-        <script>
-        (function() {
-            const btn = document.createElement("input");
-            btn.type = "checkbox";
-            btn.id = "themeToggle";
-            btn.style.position = "fixed";
-            btn.style.top = "10px";
-            btn.style.left = "10px";
-            btn.style.zIndex = "9999";
-            btn.title = "Toggle Dark Mode";
-
-            const lbl = document.createElement("label");
-            lbl.htmlFor = "themeToggle";
-            lbl.innerText = "🌞/🌙";
-            lbl.style.position = "fixed";
-            lbl.style.top = "12px";
-            lbl.style.left = "40px";
-            lbl.style.color = "black";
-            lbl.style.fontFamily = "sans-serif";
-            lbl.style.fontSize = "25px";
-            lbl.style.cursor = "pointer";
-            lbl.style.zIndex = "9999";
-
-            document.body.appendChild(lbl);
-            document.body.appendChild(btn);
-
-            btn.addEventListener("change", () => {
-                const gd = document.getElementById("my_fig");
-                if (!gd) return;
-
-                const isDark = btn.checked;
-                const newTemplate = isDark ? "plotly_dark" : "plotly_white";
-
-                const layoutUpdate = {
-                    template: newTemplate,
-                    paper_bgcolor: isDark ? "#111" : "#fff",
-                    plot_bgcolor: isDark ? "#111" : "#fff",
-                    font: { color: isDark ? "#eee" : "#000" },
-                };
+    })();
+    </script>
+    """
+
+
+
+    color_picker_js = """
+    <script>
+    (function() {
+        // Wait for the plot div to exist
+        const gd = document.getElementById("my_fig");
+        if (!gd) return;
+
+        // --- Create the panel container ---
+        const panel = document.createElement("div");
+        panel.id = "traceColorPanel";
+        panel.style.position = "fixed";
+        panel.style.bottom = "10px";
+        panel.style.right = "10px";
+        panel.style.padding = "10px";
+        panel.style.backgroundColor = "rgba(255,255,255,0.9)";
+        panel.style.border = "1px solid #888";
+        panel.style.borderRadius = "5px";
+        panel.style.fontFamily = "sans-serif";
+        panel.style.fontSize = "8px";
+        panel.style.zIndex = "9999";
+        panel.style.textAlign = "center"; // center heading
+        panel.innerHTML = '<span style="font-size:12px; font-weight:bold;">Line Colors</span><br>';
+
+        // Optional: check for dark mode toggle
+        const themeToggle = document.getElementById("themeToggle");
+
+        function applyPanelTheme() {
+            if (themeToggle && themeToggle.checked) {
+                // Dark mode
+                panel.style.backgroundColor = "rgba(30,30,30,0.9)";
+                panel.style.border = "1px solid #aaa";
+                panel.style.color = "#eee";
+            } else {
+                // Light mode
+                panel.style.backgroundColor = "rgba(255,255,255,0.9)";
+                panel.style.border = "1px solid #888";
+                panel.style.color = "#000";
+            }
+        }
 
-                console.log("Switching theme to:", newTemplate);
-                Plotly.react(gd, gd.data, Object.assign({}, gd.layout, layoutUpdate));
+        // Call it once to set initial theme
+        applyPanelTheme();
 
-                // Change page background and label color too
-                document.body.style.backgroundColor = layoutUpdate.paper_bgcolor;
-                lbl.style.color = layoutUpdate.font.color;
+        // Update panel when theme changes
+        if (themeToggle) {
+            themeToggle.addEventListener("change", () => {
+                applyPanelTheme();
+                updatePanel();
+            });
+        }
+
+
+        // --- Add a row for each visible trace ---
+        gd.data.forEach((trace, i) => {
+            const isVisible = trace.visible !== false && trace.visible !== "legendonly";
+            if (!isVisible) return;
+
+            const row = document.createElement("div");
+            row.style.marginBottom = "5px";
+            row.style.display = "flex";
+            row.style.alignItems = "left";
+            row.style.justifyContent = "left";
+
+            const label = document.createElement("span");
+            label.textContent = trace.name;
+            label.style.marginRight = "5px";
+
+            const input = document.createElement("input");
+            input.type = "color";
+            input.value = trace.line.color || "#757575";
+            input.title = "Change line color";
+
+            // Make the color box small
+            input.style.width = "14px";
+            input.style.height = "8px";
+            input.style.padding = "0";
+            input.style.marginLeft = "5px";
+            input.style.border = themeToggle && themeToggle.checked ? "1px solid #eee" : "1px solid #000";
+            input.style.verticalAlign = "middle";
+            input.style.cursor = "pointer";
+
+            input.addEventListener("input", () => {
+                Plotly.restyle(gd, {"line.color": input.value}, [i]);
             });
-        })();
-        </script>
-        """
-        
-        
-        
-        color_picker_js = """
-        <script>
-        (function() {
-            // Wait for the plot div to exist
-            const gd = document.getElementById("my_fig");
-            if (!gd) return;
-
-            // --- Create the panel container ---
-            const panel = document.createElement("div");
-            panel.id = "traceColorPanel";
-            panel.style.position = "fixed";
-            panel.style.bottom = "10px";
-            panel.style.right = "10px";
-            panel.style.padding = "10px";
-            panel.style.backgroundColor = "rgba(255,255,255,0.9)";
-            panel.style.border = "1px solid #888";
-            panel.style.borderRadius = "5px";
-            panel.style.fontFamily = "sans-serif";
-            panel.style.fontSize = "8px";
-            panel.style.zIndex = "9999";
-            panel.style.textAlign = "center"; // center heading
-            panel.innerHTML = '<span style="font-size:12px; font-weight:bold;">Line Colors</span><br>';
 
-            // Optional: check for dark mode toggle
-            const themeToggle = document.getElementById("themeToggle");
-
-            function applyPanelTheme() {
-                if (themeToggle && themeToggle.checked) {
-                    // Dark mode
-                    panel.style.backgroundColor = "rgba(30,30,30,0.9)";
-                    panel.style.border = "1px solid #aaa";
-                    panel.style.color = "#eee";
-                } else {
-                    // Light mode
-                    panel.style.backgroundColor = "rgba(255,255,255,0.9)";
-                    panel.style.border = "1px solid #888";
-                    panel.style.color = "#000";
-                }
-            }
+            row.appendChild(label);
+            row.appendChild(input);
+            panel.appendChild(row);
+        });
 
-            // Call it once to set initial theme
-            applyPanelTheme();
+        // Attach panel to body
+        document.body.appendChild(panel);
 
-            // Update panel when theme changes
-            if (themeToggle) {
-                themeToggle.addEventListener("change", () => {
-                    applyPanelTheme();
-                    updatePanel();
-                });
-            }
+        // Adjust Plotly layout margins to make room for the panel, only when its width changes
+        let panelMargin = null;
+        function fitMargin() {
+            const panelWidth = panel.offsetWidth + 20;
+            if (panelWidth === panelMargin) return;
+            panelMargin = panelWidth;
+            Plotly.relayout(gd, {"margin.r": panelWidth});
+        }
+        fitMargin();
 
+        // Optional: Update panel if traces are toggled or restyled
+        function updatePanel() {
+            const span = window.plotPerf && plotPerf.begin("updatePanel");
 
-            // --- Add a row for each visible trace ---
+            // Clear previous panel rows
+            panel.innerHTML = '<span style="font-size:12px; font-weight:bold;">Line Colors</span><br>';
             gd.data.forEach((trace, i) => {
                 const isVisible = trace.visible !== false && trace.visible !== "legendonly";
                 if (!isVisible) return;
@@ -1028,9 +2287,8 @@ def PlotParquet(parquet_path: str, html_out: str, start: str | None, end: str |
                 const input = document.createElement("input");
                 input.type = "color";
                 input.value = trace.line.color || "#757575";
-                input.title = "Change line color";
+                input.title = "Change trace color";
 
-                // Make the color box small
                 input.style.width = "14px";
                 input.style.height = "8px";
                 input.style.padding = "0";
@@ -1048,115 +2306,803 @@ def PlotParquet(parquet_path: str, html_out: str, start: str | None, end: str |
                 panel.appendChild(row);
             });
 
-            // Attach panel to body
-            document.body.appendChild(panel);
-
-            // Adjust Plotly layout margins to make room for the panel
-            const panelWidth = panel.offsetWidth + 20;
-            Plotly.relayout(gd, {margin: {r: panelWidth}});
-
-            // Optional: Update panel if traces are toggled or restyled
-            function updatePanel() {
-                // Clear previous panel rows
-                panel.innerHTML = '<span style="font-size:12px; font-weight:bold;">Line Colors</span><br>';
-                gd.data.forEach((trace, i) => {
-                    const isVisible = trace.visible !== false && trace.visible !== "legendonly";
-                    if (!isVisible) return;
-
-                    const row = document.createElement("div");
-                    row.style.marginBottom = "5px";
-                    row.style.display = "flex";
-                    row.style.alignItems = "left";
-                    row.style.justifyContent = "left";
-
-                    const label = document.createElement("span");
-                    label.textContent = trace.name;
-                    label.style.marginRight = "5px";
-
-                    const input = document.createElement("input");
-                    input.type = "color";
-                    input.value = trace.line.color || "#757575";
-                    input.title = "Change trace color";
-
-                    input.style.width = "14px";
-                    input.style.height = "8px";
-                    input.style.padding = "0";
-                    input.style.marginLeft = "5px";
-                    input.style.border = themeToggle && themeToggle.checked ? "1px solid #eee" : "1px solid #000";
-                    input.style.verticalAlign = "middle";
-                    input.style.cursor = "pointer";
-
-                    input.addEventListener("input", () => {
-                        Plotly.restyle(gd, {"line.color": input.value}, [i]);
-                    });
+            // Adjust margins again
+            fitMargin();
+            if (span) span.end();
+        }
+
+        gd.on('plotly_restyle', () => setTimeout(updatePanel, 50));
+        gd.on('plotly_update', () => setTimeout(updatePanel, 50));
+    })();
+    </script>
+    """
+
+
+
+    # Render-time instrumentation: timings are taken with performance.mark/measure, so they also show up in
+    # the browser profiler. plotPerf.begin(name).end() is what the scripts above call when it is present.
+    instrumentation_head_js = """
+    <script>performance.mark("page:head");</script>
+    """
+
+    instrumentation_js = """
+    <script>
+    (function() {
+        const entries = [];
+        let counter = 0;
+        let overlay = null;
+
+        function median(values) {
+            const sorted = values.slice().sort((a, b) => a - b);
+            return sorted.length ? sorted[Math.floor(sorted.length / 2)] : NaN;
+        }
+
+        function render() {
+            if (!overlay) return;
+            const names = [...new Set(entries.map(e => e.name))];
+            const rows = names.map(name => {
+                const own = entries.filter(e => e.name === name);
+                const last = own[own.length - 1];
+                const paint = own.map(e => e.paint_ms).filter(v => v !== undefined);
+                return `<tr><td>${name}</td><td>${own.length}</td><td>${last.ms.toFixed(1)}</td>` +
+                       `<td>${median(own.map(e => e.ms)).toFixed(1)}</td>` +
+                       `<td>${paint.length ? median(paint).toFixed(1) : ""}</td></tr>`;
+            });
+            overlay.querySelector("tbody").innerHTML = rows.join("");
+        }
+
+        function add(entry) {
+            entries.push(entry);
+            render();
+        }
+
+        window.plotPerf = {
+            entries,
+            // Time one operation; end() records it, and its paint time once the next frame is drawn
+            begin(name) {
+                const n = ++counter;
+                const startMark = `${name}:start:${n}`;
+                const t0 = performance.now();
+                performance.mark(startMark);
+                return {
+                    end() {
+                        const ms = performance.now() - t0;
+                        performance.mark(`${name}:end:${n}`);
+                        performance.measure(name, startMark, `${name}:end:${n}`);
+                        requestAnimationFrame(() => setTimeout(() => {
+                            performance.mark(`${name}:paint:${n}`);
+                            performance.measure(`${name}:paint`, startMark, `${name}:paint:${n}`);
+                            add({name, at_ms: t0, ms, paint_ms: performance.now() - t0});
+                        }, 0));
+                    },
+                };
+            },
+            exportJson() {
+                const gd = document.getElementById("my_fig");
+                const data = gd && gd.data ? gd.data : [];
+                return {
+                    url: location.href,
+                    user_agent: navigator.userAgent,
+                    created: new Date().toISOString(),
+                    traces: data.length,
+                    points: data.reduce((sum, t) => sum + (t.y ? t.y.length : 0), 0),
+                    entries,
+                };
+            },
+        };
+
+        // Plotly.js is loaded by now and the figure script is still to come: time its newPlot
+        const newPlot = Plotly.newPlot;
+        Plotly.newPlot = function() {
+            const span = plotPerf.begin("newPlot");
+            return newPlot.apply(this, arguments).then(gd => {
+                span.end();
+                return gd;
+            });
+        };
+
+        window.addEventListener("load", () => setTimeout(() => {
+            const nav = performance.getEntriesByType("navigation")[0];
+            if (nav) {
+                add({name: "html received", at_ms: 0, ms: nav.responseEnd});
+                add({name: "DOMContentLoaded", at_ms: 0, ms: nav.domContentLoadedEventEnd});
+                add({name: "load", at_ms: 0, ms: nav.loadEventEnd || performance.now()});
+            }
+            performance.getEntriesByType("paint").forEach(p => add({name: p.name, at_ms: 0, ms: p.startTime}));
+
+            overlay = document.createElement("div");
+            overlay.id = "plotPerfOverlay";
+            overlay.style.cssText = "position:fixed; bottom:10px; left:10px; z-index:9999; padding:6px 8px;" +
+                "background:rgba(255,255,255,0.92); border:1px solid #888; border-radius:5px;" +
+                "font:11px monospace; color:#000;";
+            overlay.innerHTML =
+                '<b>Render timings [ms]</b> ' +
+                '<button id="plotPerfExport" style="font-size:10px;">JSON</button> ' +
+                '<button id="plotPerfClear" style="font-size:10px;">clear</button>' +
+                '<table><thead><tr><th align="left">what</th><th>n</th><th>last</th><th>median</th>' +
+                '<th>+paint</th></tr></thead><tbody></tbody></table>';
+            document.body.appendChild(overlay);
+
+            overlay.querySelector("#plotPerfExport").addEventListener("click", () => {
+                const blob = new Blob([JSON.stringify(plotPerf.exportJson(), null, 1)], {type: "application/json"});
+                const link = document.createElement("a");
+                link.href = URL.createObjectURL(blob);
+                link.download = "render_timings.json";
+                link.click();
+                URL.revokeObjectURL(link.href);
+            });
+            overlay.querySelector("#plotPerfClear").addEventListener("click", () => {
+                entries.length = 0;
+                render();
+            });
+            render();
+        }, 0));
+    })();
+    </script>
+    """
+
+    # Pages of one split test share their x range. Following a .split-link carries it in the #x= hash;
+    # between tabs that are already open it goes through localStorage, whose "storage" event fires in the other tabs.
+    xrange_sync_js = """
+    <script>
+    (function() {
+        const gd = document.getElementById("my_fig");
+        const storageKey = "data_plotter.xrange." + SYNC_KEY;
+        let applying = false;
+
+        function currentRange() {
+            const xaxis = gd.layout.xaxis || {};
+            return xaxis.autorange === false && xaxis.range ? xaxis.range.slice() : null;
+        }
+
+        function applyRange(range) {
+            applying = true;
+            const update = range ? {"xaxis.range": range} : {"xaxis.autorange": true};
+            Plotly.relayout(gd, update).finally(() => { applying = false; });
+        }
+
+        gd.on("plotly_relayout", event => {
+            if (applying || !Object.keys(event).some(key => key.startsWith("xaxis.range") || key === "xaxis.autorange")) {
+                return;
+            }
+            try {
+                localStorage.setItem(storageKey, JSON.stringify(currentRange()));
+            } catch (e) {}  // storage disabled (e.g. some browsers on file://); links still carry the range
+        });
 
-                    row.appendChild(label);
-                    row.appendChild(input);
-                    panel.appendChild(row);
-                });
+        window.addEventListener("storage", event => {
+            if (event.key === storageKey) {
+                applyRange(JSON.parse(event.newValue));
+            }
+        });
 
-                // Adjust margins again
-                const panelWidth = panel.offsetWidth + 20;
-                Plotly.relayout(gd, {margin: {r: panelWidth}});
+        document.querySelectorAll("a.split-link").forEach(link => link.addEventListener("click", () => {
+            const range = currentRange();
+            link.hash = range ? "x=" + encodeURIComponent(JSON.stringify(range)) : "";
+        }));
+
+        const hash = location.hash.match(/^#x=(.+)$/);
+        if (hash) {
+            try {
+                applyRange(JSON.parse(decodeURIComponent(hash[1])));
+            } catch (e) {
+                console.warn("Ignoring malformed x range in the page link", e);
             }
+        }
+    })();
+    </script>
+    """.replace("SYNC_KEY", json.dumps(sync_key))
+
+    # Step 3 — append JS before </body>
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    if instrument:
+        html = html.replace("</head>", instrumentation_head_js + "</head>", 1)
+        html = html.replace(f'<div id="{div_id}"', instrumentation_js + f'<div id="{div_id}"', 1)
+
+    if header_html:
+        html = html.replace(f'<div id="{div_id}"', header_html + f'<div id="{div_id}"', 1)
+
+    scripts = js_code + theme_toggle_js + color_picker_js + (xrange_sync_js if sync_key else "")
+    html = html.replace("</body>", extra_html + (SummaryTableHtml(summary) if summary else "") + scripts + "\n</body>")
+
+    # Step 4 — write modified HTML back
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+# Spectral view: streaming Welch PSDs and spectrograms of the chamber and injector PTs
+SPECTRAL_SENSOR_PATTERN = re.compile(r"^PT-(CHAMBER|OX-.+|FU-.+)$")
+SPECTRAL_NPERSEG = 4096  # samples per FFT segment (50% overlap, Hann window)
+SPECTRAL_CHUNK_ROWS = 1_000_000  # parquet rows decoded at a time
+SPECTROGRAM_MAX_COLUMNS = 400  # segments are averaged down to at most this many time columns
+
+
+class WelchAccumulator:
+    """Welch PSD and spectrogram of one channel, fed in arbitrary chunks.
+
+    Only the unfinished tail of the previous chunk is carried over, so memory is bounded by the chunk
+    size no matter how long the capture is. Gaps in the data are not bridged; samples are taken as contiguous.
+    """
+
+    def __init__(self, fs: float, expected_samples: int, nperseg: int = SPECTRAL_NPERSEG):
+        self.fs = fs
+        self.nperseg = nperseg
+        self.step = nperseg // 2
+        self.window = np.hanning(nperseg)
+        self.scale = 1.0 / (fs * np.sum(self.window**2))
+        self.tail = np.empty(0)
+        self.psd_sum = np.zeros(nperseg // 2 + 1)
+        self.n_segments = 0
+
+        expected_segments = max(1, (expected_samples - nperseg) // self.step + 1)
+        self.segments_per_column = max(1, -(-expected_segments // SPECTROGRAM_MAX_COLUMNS))
+        self.column_sum = np.zeros(nperseg // 2 + 1)
+        self.column_count = 0
+        self.columns = []
+
+    def feed(self, values: np.ndarray):
+        data = np.concatenate((self.tail, values)) if len(self.tail) else values
+        n_segments = (len(data) - self.nperseg) // self.step + 1 if len(data) >= self.nperseg else 0
+
+        if n_segments > 0:
+            segments = np.lib.stride_tricks.sliding_window_view(data, self.nperseg)[:: self.step][:n_segments]
+            segments = (segments - segments.mean(axis=1, keepdims=True)) * self.window
+            power = np.abs(np.fft.rfft(segments, axis=1)) ** 2 * self.scale
+            power[:, 1:-1] *= 2  # one-sided
+
+            self.psd_sum += power.sum(axis=0)
+            self.n_segments += n_segments
+
+            # Fold segments into spectrogram columns of segments_per_column each
+            offset = 0
+            while offset < n_segments:
+                take = min(self.segments_per_column - self.column_count, n_segments - offset)
+                self.column_sum += power[offset : offset + take].sum(axis=0)
+                self.column_count += take
+                offset += take
+                if self.column_count == self.segments_per_column:
+                    self.columns.append(self.column_sum / self.column_count)
+                    self.column_sum = np.zeros_like(self.column_sum)
+                    self.column_count = 0
+
+        self.tail = data[n_segments * self.step :].copy()
+
+    def result(self):
+        if self.column_count:
+            self.columns.append(self.column_sum / self.column_count)
+        freqs = np.fft.rfftfreq(self.nperseg, 1.0 / self.fs)
+        psd = self.psd_sum / max(self.n_segments, 1)
+        column_seconds = self.segments_per_column * self.step / self.fs
+        times = (np.arange(len(self.columns)) + 0.5) * column_seconds
+        spectrogram = np.array(self.columns).T if self.columns else np.empty((len(freqs), 0))
+        return freqs, psd, times, spectrogram
+
+
+def SpectralSensors(columns) -> list:
+    return [c for c in columns if SPECTRAL_SENSOR_PATTERN.match(c)]
+
+
+def ComputeSpectra(
+    parquet_path: str,
+    channels: list,
+    sample_rates: dict,
+    expected_samples: dict,
+    start: str | None = None,
+    end: str | None = None,
+    workers: int | None = None,
+) -> dict:
+    """Stream the parquet in row chunks and feed each channel's valid samples to its WelchAccumulator.
+
+    Channels are processed in parallel within a chunk (NumPy FFTs release the GIL).
+    """
+    accumulators = {
+        c: WelchAccumulator(sample_rates[c], expected_samples[c]) for c in channels if sample_rates.get(c)
+    }
+    parquet_file = pq.ParquetFile(parquet_path)
+    start_ns = UtcTimestamp(start).as_unit("ns").value if start else None
+    end_ns = UtcTimestamp(end).as_unit("ns").value if end else None
+
+    def feed(channel, column, keep):
+        values = column.to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        if keep is not None:
+            values = values[keep]
+        accumulators[channel].feed(values[~np.isnan(values)])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in parquet_file.iter_batches(
+            batch_size=SPECTRAL_CHUNK_ROWS, columns=["timestamp"] + list(accumulators)
+        ):
+            keep = None
+            if start_ns is not None or end_ns is not None:
+                times = batch.column("timestamp").cast(pa.timestamp("ns", tz="UTC")).cast(pa.int64()).to_numpy()
+                keep = np.ones(len(times), dtype=bool)
+                if start_ns is not None:
+                    keep &= times >= start_ns
+                if end_ns is not None:
+                    keep &= times <= end_ns
+                if not keep.any():
+                    continue
+
+            list(pool.map(lambda c: feed(c, batch.column(c), keep), accumulators))
+
+    return {channel: accumulator.result() for channel, accumulator in accumulators.items()}
+
+
+def SpectralFigure(spectra: dict, title: str) -> go.Figure:
+    """PSDs of all channels on one log-log panel, then one spectrogram panel per channel."""
+    channels = list(spectra)
+    fig = make_subplots(
+        rows=1 + len(channels),
+        cols=1,
+        subplot_titles=["Welch PSD"] + [f"{c} spectrogram" for c in channels],
+        vertical_spacing=0.3 / max(1, len(channels)),
+    )
 
-            gd.on('plotly_restyle', () => setTimeout(updatePanel, 50));
-        })();
-        </script>
-        """
+    for channel, (freqs, psd, times, spectrogram) in spectra.items():
+        fig.add_trace(
+            go.Scatter(x=freqs[1:], y=psd[1:], mode="lines", name=channel,
+                       hovertemplate="%{x:.1f} Hz: %{y:.3g} psi²/Hz"),
+            row=1, col=1,
+        )
 
+    for row, (channel, (freqs, psd, times, spectrogram)) in enumerate(spectra.items(), start=2):
+        with np.errstate(divide="ignore"):
+            power_db = 10 * np.log10(spectrogram[1:])
+        fig.add_trace(
+            go.Heatmap(x=times, y=freqs[1:], z=power_db.astype(np.float32), colorscale="Viridis",
+                       showscale=False, name=channel,
+                       hovertemplate="%{x:.1f} s, %{y:.1f} Hz: %{z:.1f} dB"),
+            row=row, col=1,
+        )
+        fig.update_xaxes(title_text="Time from window start [s]", row=row, col=1)
+        fig.update_yaxes(title_text="Frequency [Hz]", row=row, col=1)
+
+    fig.update_xaxes(type="log", title_text="Frequency [Hz]", row=1, col=1)
+    fig.update_yaxes(type="log", title_text="PSD [psi²/Hz]", row=1, col=1)
+    fig.update_layout(title=f"{title} — spectral view", height=350 * (1 + len(channels)))
+    return fig
+
+
+def StoredSampleRate(df: pd.DataFrame, column: str) -> tuple:
+    """(sample rate in Hz, sample count) of a channel as stored in the loaded frame.
+
+    The summary's sample_rate_hz describes the native CSV rate, which a --resample conversion does not keep.
+    """
+    times = df.index.as_unit("ns").asi8[df[column].notna().to_numpy()]
+    if len(times) < 2:
+        return None, len(times)
+    median_dt = np.median(np.diff(times))
+    return (1e9 / median_dt if median_dt > 0 else None), len(times)
+
+
+def WriteSpectralPage(
+    parquet_path: str,
+    html_out: str,
+    df: pd.DataFrame,
+    start: str | None,
+    end: str | None,
+    workers: int | None = None,
+    asset_path: str | None = None,
+) -> str | None:
+    """Compute spectra for the pressure channels and save them as their own page; returns its path.
+
+    df is the loaded frame cut to [start, end]; rates and spectrogram columns are sized from it.
+    """
+    channels = SpectralSensors(df.columns)
+    stored = {c: StoredSampleRate(df, c) for c in channels}
+    sample_rates = {c: rate for c, (rate, _) in stored.items()}
+    expected = {c: count for c, (_, count) in stored.items()}
+
+    channels = [c for c in channels if sample_rates[c] and expected[c] >= SPECTRAL_NPERSEG]
+    if not channels:
+        print("Spectral view: no pressure channels with enough samples; skipping")
+        return None
+
+    print(f"Computing spectra for {len(channels)} channels...")
+    spectra = ComputeSpectra(parquet_path, channels, sample_rates, expected, start, end, workers)
+    # Companion pages go in a folder named after the plot, so the catalog's output/*.html scan only sees tests
+    spectral_out = os.path.join(os.path.splitext(html_out)[0], "spectral.html")
+    os.makedirs(os.path.dirname(spectral_out), exist_ok=True)
+    SpectralFigure(spectra, Path(parquet_path).name).write_html(
+        spectral_out, include_plotlyjs=PlotlyJsSource(spectral_out, asset_path), full_html=True
+    )
+    print(f"✓ Spectral view saved to {spectral_out}")
+    return spectral_out
+
+
+def WindowBound(value: str | None, t0: pd.Timestamp | None) -> str | None:
+    """A --start/--end/--window bound: a timestamp, or a number of seconds from T-0."""
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return value
+    if t0 is None:
+        raise SystemExit(f"Window bound {value!r} is in seconds from T-0; use --relative-time file or event")
+    return (t0 + pd.Timedelta(seconds=seconds)).isoformat()
+
+
+def ParseWindow(text: str) -> tuple:
+    """'[NAME=]START,END' as (name, start, end); an empty START or END leaves that side open."""
+    name, _, bounds = text.partition("=") if "=" in text else ("", "", text)
+    start, sep, end = bounds.partition(",")
+    if not sep:
+        raise SystemExit(f"Window {text!r} must look like [NAME=]START,END")
+    return name.strip() or None, start.strip() or None, end.strip() or None
+
+
+def LoadWindowsFile(path: str) -> list:
+    """One [NAME=]START,END window per line; blank lines and # comments are skipped."""
+    windows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                windows.append(ParseWindow(line))
+    return windows
+
+
+def WindowLabel(name: str | None, start: str | None, end: str | None) -> str:
+    """File-name-safe label for a window's page."""
+    label = name or f"{start or 'begin'}_{end or 'end'}"
+    return re.sub(r"[^0-9A-Za-z.+-]+", "-", label).strip("-")
+
+
+# --offline-assets: pages load one shared plotly.js from <output>/assets instead of the CDN
+PLOTLY_ASSET_DIR = "assets"
+
+# --precompress: .gz/.br siblings for static servers that serve them directly (nginx gzip_static, caddy precompressed)
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 5  # within ~3% of quality 11 on plot pages at ~25x the speed
+
+
+def PlotlyAsset(output_dir: str) -> str:
+    """Path of the plotly.js bundled with plotly.py under output_dir/assets, written on first use.
+
+    The file name carries the plotly.js version, so pages built with an older plotly keep the copy they were built for.
+    """
+    asset_path = os.path.join(output_dir, PLOTLY_ASSET_DIR, f"plotly-{plotly.offline.get_plotlyjs_version()}.min.js")
+    if not os.path.exists(asset_path):
+        os.makedirs(os.path.dirname(asset_path), exist_ok=True)
+        # Written under a temporary name so a concurrent job never links a half-written file
+        tmp_path = f"{asset_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(plotly.offline.get_plotlyjs())
+        os.replace(tmp_path, asset_path)
+        print(f"Saved shared plotly.js to {asset_path}")
+    return asset_path
+
+
+def PlotlyJsSource(page_path: str, asset_path: str | None) -> str:
+    """include_plotlyjs for a page: the CDN, or the shared asset as a path relative to the page."""
+    if asset_path is None:
+        return "cdn"
+    return Path(os.path.relpath(asset_path, os.path.dirname(page_path) or ".")).as_posix()
+
+
+def _CompressFile(path: str, suffix: str, brotli) -> tuple:
+    out_path = path + suffix
+    if os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(path):
+        return out_path, os.path.getsize(out_path), False
+
+    with open(path, "rb") as f:
+        data = f.read()
+    if suffix == ".gz":
+        # mtime=0 keeps the output byte-identical across runs, so unchanged pages do not churn in git
+        compressed = gzip.compress(data, PRECOMPRESS_GZIP_LEVEL, mtime=0)
+    else:
+        compressed = brotli.compress(data, quality=PRECOMPRESS_BROTLI_QUALITY)
+
+    with open(out_path, "wb") as f:
+        f.write(compressed)
+    return out_path, len(compressed), True
+
+
+def PrecompressFiles(paths: list, workers: int | None = None) -> list:
+    """Write .gz (and .br, if brotli is installed) next to each file, in parallel; returns the written paths.
+
+    Siblings newer than their source are kept, so the shared plotly.js is compressed only once.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("brotli is not installed (pip install brotli); writing .gz only")
+
+    suffixes = [".gz"] + ([".br"] if brotli is not None else [])
+    jobs = [(path, suffix) for path in dict.fromkeys(paths) for suffix in suffixes]
+
+    # zlib releases the GIL while compressing, so the .gz files are written side by side with the brotli ones
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda job: _CompressFile(job[0], job[1], brotli), jobs))
+
+    for (path, _), (out_path, size, fresh) in zip(jobs, results):
+        note = "" if fresh else ", up to date"
+        print(f"  {out_path}: {size / 1e6:.2f} MB ({size / os.path.getsize(path):.0%} of the original{note})")
+    return [out_path for out_path, _, _ in results]
+
+
+# Pages written by --split: (file name, page title, tag matched against trace names as in TOGGLE_GROUPS)
+SPLIT_PAGES = [
+    ("ox", "Oxidizer", "-OX"),
+    ("fu", "Fuel", "-FU"),
+    ("he", "Helium", "-HE"),
+    ("n2", "Nitrogen", "-N2"),
+    ("pt", "Pressure (PT)", "PT-"),
+    ("tc", "Temperature (TC)", "TC-"),
+    ("rtd", "RTD", "RTD-"),
+    ("pi", "Position indicators (PI)", "PI-"),
+    ("fms", "Load cell (FMS)", "FMS"),
+]
 
 
-        # Step 3 — append JS before </body>
-        with open(path, "r", encoding="utf-8") as f:
-            html = f.read()
+def SplitSummary(summary: dict | None, tag: str) -> dict | None:
+    """The summary restricted to one split page's channels; flags on a whole time group are kept."""
+    if summary is None:
+        return None
+    return dict(
+        summary,
+        channels={name: s for name, s in summary["channels"].items() if tag in name},
+        quality=[flag for flag in summary.get("quality", []) if not flag["channel"] or tag in flag["channel"]],
+    )
 
-        html = html.replace("</body>", js_code + theme_toggle_js + hide_unused_axis_js + color_picker_js + "\n</body>")
 
-        # Step 4 — write modified HTML back
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(html)
+def SplitNavHtml(links: list, current: str) -> str:
+    """Link bar across the pages of a split test; links is [(label, href)]."""
+    items = [
+        f"<b>{label}</b>" if label == current else f'<a class="split-link" href="{href}">{label}</a>'
+        for label, href in links
+    ]
+    return f'<div id="splitNav" style="font-family:sans-serif; margin:10px 20px;">{" | ".join(items)}</div>'
+
+
+def PlotParquet(
+    parquet_path: str,
+    html_out: str,
+    start: str | None,
+    end: str | None,
+    use_cache: bool = False,
+    relative_time: str | None = None,
+    workers: int | None = None,
+    validate_figure: bool = True,
+    spectral: bool = False,
+    instrument: bool = False,
+    point_budget: int | None = None,
+    split: bool = False,
+    asset_dir: str | None = None,
+) -> list:
+    """Plot a converted test to html_out; returns the paths of every file written for it.
+
+    split also writes one page per SPLIT_PAGES entry into a folder named after html_out, all cut from the same
+    thinned traces and linked to each other with synchronized x ranges.
+    asset_dir points every page at one shared local plotly.js kept there (see PlotlyAsset) instead of the CDN.
+    """
+    pio.templates.default = THEME
+    df = CachedPlotFrame(parquet_path, use_cache)
+    os.makedirs(os.path.dirname(html_out) or ".", exist_ok=True)
+    asset_path = PlotlyAsset(asset_dir) if asset_dir else None
+    written = [asset_path] if asset_path else []
+
+    # Resolve T-0 on the full file so 'file' and 'event' do not depend on the window
+    t0 = ReferenceTime(df, relative_time, None) if relative_time in ("file", "event") else None
+    start, end = WindowBound(start, t0), WindowBound(end, t0)
+    if relative_time == "start":
+        t0 = ReferenceTime(df, relative_time, start)
+
+    summary = LoadSummary(parquet_path)
+    if summary is None:
+        # Parquet came in without a conversion pass; summarize the whole test before any window is cut,
+        # since the sidecar describes the file and is shared by every page of it
+        summary_path = WriteSummary(
+            parquet_path, SummarizeTimeGroup(df.select_dtypes("number"), None), parquet_path, len(df)
+        )
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
 
+    if start or end:
+        df = df.loc[start:end]
 
-    if traces_added == 0:
-        print("WARNING: No traces were added to the plot!")
-        print(f"Available columns in data: {list(df.columns)}")
-        print(f"Requested sensors: {[s['column'] for s in SENSORS_TO_PLOT]}")
+    # Thin once; with --split every page takes its traces from this list
+    traces = BuildTraces(df, SensorsWithUnits(SENSORS_TO_PLOT, summary), t0, workers, point_budget)
+    title = Path(parquet_path).name
+    figure = FigureFromFrame(df, title, t0, summary, SENSORS_TO_PLOT, workers, validate_figure, traces=traces)
+    traces_added = len(traces)
+
+    split_pages = []
+    if split:
+        for key, page_title, tag in SPLIT_PAGES:
+            page_traces = [trace for trace in traces if tag in trace["name"]]
+            if page_traces:
+                split_pages.append((key, page_title, tag, page_traces))
+        if not split_pages:
+            print("Warning: no traces match any split page; writing only the full plot")
+
+    split_dir = os.path.splitext(html_out)[0]
+    sync_key = Path(os.path.splitext(html_out)[0]).as_posix() if split_pages else None
+    header_html = ""
+    if split_pages:
+        links = [("All", Path(html_out).name)] + [
+            (page_title, f"{Path(split_dir).name}/{key}.html") for key, page_title, _, _ in split_pages
+        ]
+        header_html = SplitNavHtml(links, "All")
+
+    extra_html = ""
+    if spectral:
+        spectral_out = WriteSpectralPage(parquet_path, html_out, df, start, end, workers, asset_path)
+        if spectral_out:
+            written.append(spectral_out)
+            extra_html = (
+                f'<p style="font-family:sans-serif; margin:20px;">'
+                f'<a href="{Path(html_out).stem}/spectral.html">Spectral view (PSD / spectrogram)</a></p>'
+            )
 
-    fig.update_layout(xaxis=dict(title=X_AXIS_LABEL), hovermode="x unified")
-    used_axes.sort(key=lambda a: int(a[1:]) if a[1:].isdigit() else 1)
+    print(f"Saving plot to {html_out}...")
+    export_plot_with_dynamic_buttons(
+        figure,
+        html_out,
+        summary,
+        div_id="my_fig",
+        extra_html=extra_html,
+        instrument=instrument,
+        header_html=header_html,
+        sync_key=sync_key,
+        plotlyjs=PlotlyJsSource(html_out, asset_path),
+    )
+    written.append(html_out)
+    print(f"✓ Plot saved with {traces_added} traces")
 
-    step = 0.14 / max(1, len(used_axes) - 1) if len(used_axes) > 1 else 0
+    if split_pages:
+        os.makedirs(split_dir, exist_ok=True)
+        # Split pages sit one folder down, so the catalog's output/*.html scan does not list them as tests
+        links = [("All", f"../{Path(html_out).name}")] + [
+            (page_title, f"{key}.html") for key, page_title, _, _ in split_pages
+        ]
+        for key, page_title, tag, page_traces in split_pages:
+            page_out = os.path.join(split_dir, f"{key}.html")
+            page_summary = SplitSummary(summary, tag)
+            page_figure = FigureFromFrame(
+                df, f"{title} — {page_title}", t0, page_summary, SENSORS_TO_PLOT,
+                validate_figure=validate_figure, traces=page_traces,
+            )
+            export_plot_with_dynamic_buttons(
+                page_figure,
+                page_out,
+                page_summary,
+                div_id="my_fig",
+                instrument=instrument,
+                header_html=SplitNavHtml(links, page_title),
+                sync_key=sync_key,
+                plotlyjs=PlotlyJsSource(page_out, asset_path),
+            )
+            written.append(page_out)
+            print(f"  Saved {page_out} ({len(page_traces)} traces)")
 
-    for i, y_axis_key in enumerate(used_axes):
+    return written
 
-        y_axis_label = Y_AXIS_LABELS.get(y_axis_key, y_axis_key)
-        if y_axis_key == "y1":
-            dictionary = dict(title=dict(text=y_axis_label),
-                              side="left",
-                              position=0.0,
-                              showgrid=True)
-        else:
-            side = "right" if i % 2 else "left"
-            pos = (1 - (i // 2) * step) if side == "right" else ((i // 2 + 1) * step)
-            pos = max(0.02, min(0.98, pos))
-            dictionary = dict(
-                title=dict(text=y_axis_label),
-                overlaying="y",
-                side=side,
-                position=pos,
-                showgrid=False,
-            )
 
-        layout_key = _layout_axis_key(y_axis_key)
-        fig.update_layout(**{layout_key: dictionary})
+# ---------------------------------------------------------------------------
+# Importable API: load tests and build figures from notebooks/scripts without writing HTML.
+#
+#   from main import load_test, build_figure
+#   groups = load_test("data/test.parquet", sensors=["PT-OX-02", "FMS"], start="2025-11-19 20:01")
+#   fig = build_figure("data/test.parquet", start=..., end=...)
+# ---------------------------------------------------------------------------
 
-    print(f"Saving plot to {html_out}...")
-    export_plot_with_dynamic_buttons(fig, html_out, div_id="my_fig")
-    print(f"✓ Plot saved with {traces_added} traces")
+# Loaded tests are kept in memory up to this many bytes, least recently used evicted first
+TEST_CACHE_MAX_BYTES = 2 * 1024**3
+
+_test_cache = OrderedDict()  # (path, mtime_ns, use_cache) -> (frame, nbytes)
+_test_cache_lock = threading.Lock()
+
+
+def CachedPlotFrame(parquet_path: str, use_cache: bool = False) -> pd.DataFrame:
+    """LoadPlotFrame behind an in-process LRU cache keyed by path and mtime.
+
+    The returned frame is shared between callers and must not be modified in place.
+    """
+    key = (os.path.abspath(parquet_path), os.stat(parquet_path).st_mtime_ns, use_cache)
+
+    with _test_cache_lock:
+        if key in _test_cache:
+            _test_cache.move_to_end(key)
+            return _test_cache[key][0]
+
+    df = LoadPlotFrame(parquet_path, use_cache)
+    nbytes = int(df.memory_usage(index=True, deep=False).sum())
+
+    with _test_cache_lock:
+        # A rewritten file gets a new mtime; drop whatever was cached for its old contents
+        for old_key in [k for k in _test_cache if k[0] == key[0] and k != key]:
+            del _test_cache[old_key]
+        _test_cache[key] = (df, nbytes)
+        total = sum(size for _, size in _test_cache.values())
+        while total > TEST_CACHE_MAX_BYTES and len(_test_cache) > 1:
+            _, (_, evicted_bytes) = _test_cache.popitem(last=False)
+            total -= evicted_bytes
+
+    return df
+
+
+def clear_test_cache():
+    with _test_cache_lock:
+        _test_cache.clear()
+
+
+def load_test(
+    path: str,
+    sensors: list | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    as_arrow: bool = False,
+    use_cache: bool = False,
+) -> dict:
+    """Data of a converted test split back into its time groups.
+
+    Returns {time column: frame} where each frame holds only that group's channels and
+    rows, indexed by timestamp (or a pyarrow Table with a timestamp column if as_arrow).
+    Channels without a known group (no conversion summary) are returned under "timestamp".
+    """
+    df = CachedPlotFrame(path, use_cache)
+    if start or end:
+        df = df.loc[start:end]
+
+    columns = list(df.columns) if sensors is None else [c for c in sensors if c in df.columns]
+    missing = [] if sensors is None else [c for c in sensors if c not in df.columns]
+    if missing:
+        print(f"Warning: sensors not in {path}: {missing}")
+
+    summary = LoadSummary(path)
+    channel_groups = {} if summary is None else {
+        name: s.get("group") for name, s in summary["channels"].items()
+    }
+
+    grouped = defaultdict(list)
+    for column in columns:
+        # Raw readings of calibrated channels belong to their channel's group
+        grouped[channel_groups.get(column.removesuffix(RAW_SUFFIX)) or "timestamp"].append(column)
+
+    groups = {}
+    for time_column, group_columns in grouped.items():
+        frame = df[group_columns].dropna(how="all")
+        if as_arrow:
+            frame = pa.Table.from_pandas(frame.rename_axis("timestamp"), preserve_index=True)
+        groups[time_column] = frame
+
+    return groups
 
 
-def main():
+def build_figure(
+    path: str,
+    sensors: list | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    relative_time: str | None = None,
+    use_cache: bool = False,
+    workers: int | None = None,
+    point_budget: int | None = None,
+) -> go.Figure:
+    """The same figure PlotParquet would write, returned instead of saved.
+
+    sensors: sensor names/columns to keep from SENSORS_TO_PLOT (default: all of them)
+    point_budget: total points for the figure instead of MAX_POINTS_PER_TRACE per trace
+    """
+    pio.templates.default = THEME
+    df = CachedPlotFrame(path, use_cache)
+    t0 = ReferenceTime(df, relative_time, start) if relative_time else None
+    if start or end:
+        df = df.loc[start:end]
+
+    selected = SENSORS_TO_PLOT
+    if sensors is not None:
+        selected = [s for s in SENSORS_TO_PLOT if s["column"] in sensors or s.get("name") in sensors]
+
+    return FigureFromFrame(df, Path(path).name, t0, LoadSummary(path), selected, workers, point_budget=point_budget)
+
+
+def main(argv: list | None = None):
 
     DEFAULT_PATH = "data/04-06-2025-cold_flow.csv"
     _SENTINEL = object()
@@ -1171,8 +3117,108 @@ def main():
 
     ap.add_argument("--start", default=None)
     ap.add_argument("--end", default=None)
+    ap.add_argument(
+        "--window",
+        action="append",
+        default=[],
+        metavar="[NAME=]START,END",
+        help="render this window to output/<name>/<NAME>.html; repeatable, the data is loaded once for all windows. "
+        "With --relative-time file/event, bounds may be seconds from T-0 (e.g. burn=-2,2)",
+    )
+    ap.add_argument(
+        "--windows-file",
+        default=None,
+        help="file with one [NAME=]START,END window per line, rendered like --window",
+    )
+    ap.add_argument(
+        "--resample",
+        default=None,
+        metavar="PERIOD",
+        help="bin every time group onto a shared uniform grid when converting a CSV (e.g. 1ms, 10ms)",
+    )
+    ap.add_argument(
+        "--align-tolerance",
+        default=None,
+        metavar="TOLERANCE",
+        help="join the Dev5/Dev6 clocks by nearest sample within this tolerance when converting (e.g. 2ms)",
+    )
+    ap.add_argument(
+        "--clock-offset",
+        action="append",
+        default=[],
+        metavar="TIME_COLUMN=SECONDS",
+        help="shift a time group's clock before resampling/aligning, e.g. Dev6_BCLS_ai_time=-0.0013 (repeatable)",
+    )
+    ap.add_argument(
+        "--calibration",
+        default=None,
+        metavar="TABLE.json",
+        help="calibration table applied when converting; for a parquet input, recomputes only channels whose "
+        "calibration changed since it was written",
+    )
+    ap.add_argument(
+        "--relative-time",
+        choices=["file", "start", "event"],
+        default=None,
+        help=f"plot time as seconds from T-0: file start, the --start instant, or the {EVENT_SENSOR} rise",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="threads used to extract and thin sensors (default: one per core)",
+    )
+    ap.add_argument(
+        "--fast-figure",
+        action="store_true",
+        help="hand raw trace dicts to the HTML writer without plotly.py validation",
+    )
+    ap.add_argument(
+        "--spectral",
+        action="store_true",
+        help="also write output/<name>/spectral.html with Welch PSDs and spectrograms of the chamber/injector PTs",
+    )
+    ap.add_argument(
+        "--point-budget",
+        type=int,
+        default=None,
+        metavar="POINTS",
+        help=f"total points for the whole figure, split across traces by signal activity "
+        f"(at least {POINT_BUDGET_MIN_PER_TRACE:,} each) instead of {MAX_POINTS_PER_TRACE:,} per trace",
+    )
+    ap.add_argument(
+        "--instrument",
+        action="store_true",
+        help="embed render timings (newPlot, toggles, theme, color panel) in an overlay with JSON export",
+    )
+    ap.add_argument(
+        "--cache",
+        action="store_true",
+        help="keep a memory-mapped arrow copy of the cleaned data next to the parquet for fast re-plotting",
+    )
+    ap.add_argument(
+        "--split",
+        action="store_true",
+        help="also write one linked page per fluid (OX/FU/HE/N2) and sensor type (PT/TC/RTD/PI/FMS) "
+        "to output/<name>/, with x ranges kept in sync",
+    )
+    ap.add_argument(
+        "--offline-assets",
+        action="store_true",
+        help="load plotly.js from one shared, versioned copy in output/assets instead of the CDN (works offline)",
+    )
+    ap.add_argument(
+        "--precompress",
+        action="store_true",
+        help="also write .html.gz (and .html.br if brotli is installed) next to every page, in parallel",
+    )
+    ap.add_argument(
+        "--convert-only",
+        action="store_true",
+        help="convert (or recalibrate) the input and stop without plotting",
+    )
 
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
 
     if args.input_path is _SENTINEL:
@@ -1181,18 +3227,82 @@ def main():
         args.input_path = DEFAULT_PATH
 
     path_to_input_file = args.input_path
-    input_file_name = os.path.splitext(os.path.basename(path_to_input_file))[0]
-
-    if path_to_input_file.lower().endswith(".csv"):
-        parquet_path = ConvertCSVToParquet(path_to_input_file)
+    input_file_name = os.path.basename(InputBase(path_to_input_file))
+
+    clock_offsets = {}
+    for clock_offset in args.clock_offset:
+        time_column, _, seconds = clock_offset.partition("=")
+        try:
+            offset = float(seconds)
+        except ValueError:
+            offset = np.nan
+        if not time_column or not np.isfinite(offset):
+            ap.error(f"--clock-offset expects TIME_COLUMN=SECONDS, e.g. {DEV6_TIME}=-0.0013 (got {clock_offset!r})")
+        clock_offsets[time_column] = offset
+
+    calibration = LoadCalibration(args.calibration) if args.calibration else None
+
+    if path_to_input_file.lower().endswith(CONVERTIBLE_SUFFIXES):
+        parquet_path = ConvertCSVToParquet(
+            path_to_input_file,
+            resample=args.resample,
+            align_tolerance=args.align_tolerance,
+            clock_offsets=clock_offsets,
+            calibration=calibration,
+        )
     elif path_to_input_file.lower().endswith((".parquet", ".pq")):
         parquet_path = path_to_input_file
+        if calibration:
+            RecalibrateParquet(parquet_path, calibration)
+    else:
+        raise SystemExit("input must be .csv, .csv.gz, .csv.zst, .tdms or .parquet")
+
+    if args.convert_only:
+        print(f"\n✓ Complete! Data at: {parquet_path}")
+        return
+
+    windows = [ParseWindow(window) for window in args.window]
+    if args.windows_file:
+        windows += LoadWindowsFile(args.windows_file)
+
+    if windows:
+        pages = [
+            (os.path.join("output", input_file_name, f"{WindowLabel(*window)}.html"), window[1], window[2])
+            for window in windows
+        ]
     else:
-        raise SystemExit("input must be .csv or .parquet")
+        pages = [(os.path.join("output", f"{input_file_name}.html"), args.start, args.end)]
+
+    # Every page goes through CachedPlotFrame, so the parquet is read and cleaned only for the first one
+    written = []
+    for html_out, start, end in pages:
+        written += PlotParquet(
+            parquet_path,
+            html_out,
+            start,
+            end,
+            use_cache=args.cache,
+            relative_time=args.relative_time,
+            workers=args.workers,
+            validate_figure=not args.fast_figure,
+            spectral=args.spectral,
+            instrument=args.instrument,
+            point_budget=args.point_budget,
+            split=args.split,
+            asset_dir="output" if args.offline_assets else None,
+        )
+        print(f"\n✓ Complete! Plot saved to: {html_out}")
 
-    html_out = os.path.join("output", f"{input_file_name}.html")
-    PlotParquet(parquet_path, html_out, args.start, args.end)
-    print(f"\n✓ Complete! Plot saved to: {html_out}")
+    if args.precompress:
+        print(f"Precompressing {len(set(written))} files...")
+        PrecompressFiles(written, args.workers)
+    else:
+        # A page rewritten without --precompress must not be shadowed by an older compressed copy
+        for path in dict.fromkeys(written):
+            for stale_path in (f"{path}.gz", f"{path}.br"):
+                if os.path.exists(stale_path) and os.path.getmtime(stale_path) < os.path.getmtime(path):
+                    os.remove(stale_path)
+                    print(f"Removed stale {stale_path}")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,149 @@
+import argparse, os, time
+
 import pandas as pd
+import pyarrow as pa, pyarrow.compute as pc, pyarrow.csv as pa_csv, pyarrow.parquet as pq
+
+TIME_COLUMN = "timestamp"
+BATCH_SIZE = 65_536
+
+# output suffix -> arrow stream compression
+COMPRESSED_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd"}
+
+
+def _TimeScalar(value: str, arrow_type: pa.DataType) -> pa.Scalar:
+    timestamp = pd.Timestamp(value)
+    timestamp = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+    return pa.scalar(timestamp.to_pydatetime(), type=arrow_type)
+
+
+def SelectRowGroups(parquet_file: pq.ParquetFile, start, end) -> list[int]:
+    """Row groups whose timestamp statistics overlap [start, end]; the rest are never read or decoded."""
+    metadata = parquet_file.metadata
+    time_index = parquet_file.schema_arrow.get_field_index(TIME_COLUMN)
+    selected = []
+
+    for rg_index in range(metadata.num_row_groups):
+        stats = metadata.row_group(rg_index).column(time_index).statistics
+        if stats is None or not stats.has_min_max:
+            selected.append(rg_index)
+            continue
+        rg_min, rg_max = pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+        if (end is not None and rg_min > end) or (start is not None and rg_max < start):
+            continue
+        selected.append(rg_index)
+
+    return selected
+
+
+def OpenSink(csv_path: str):
+    suffix = os.path.splitext(csv_path)[1].lower()
+    if suffix in COMPRESSED_SUFFIXES:
+        return pa.CompressedOutputStream(csv_path, COMPRESSED_SUFFIXES[suffix])
+    return pa.OSFile(csv_path, "wb")
+
+
+def ExportParquetToCSV(
+    parquet_path: str,
+    csv_path: str,
+    columns: list[str] | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    batch_size: int = BATCH_SIZE,
+    keep_empty_rows: bool = False,
+) -> int:
+    """Stream a parquet file to CSV batch by batch, so memory stays bounded by batch_size.
+
+    Column selection and row-group pruning happen before anything is decoded;
+    the exact time window is then applied to each decoded batch. With columns selected, rows where
+    all of them are null (samples of other time groups) are dropped unless keep_empty_rows.
+    """
+    parquet_file = pq.ParquetFile(parquet_path)
+    schema = parquet_file.schema_arrow
+
+    drop_empty = bool(columns) and not keep_empty_rows
+    if columns:
+        missing = [c for c in columns if c not in schema.names]
+        if missing:
+            raise ValueError(f"Columns not in {parquet_path}: {missing}")
+        columns = [TIME_COLUMN] + [c for c in columns if c != TIME_COLUMN]
+    else:
+        columns = schema.names
+
+    time_type = schema.field(TIME_COLUMN).type
+    start_scalar = _TimeScalar(start, time_type) if start else None
+    end_scalar = _TimeScalar(end, time_type) if end else None
+
+    row_groups = SelectRowGroups(
+        parquet_file,
+        pd.Timestamp(start_scalar.as_py()) if start_scalar is not None else None,
+        pd.Timestamp(end_scalar.as_py()) if end_scalar is not None else None,
+    )
+    print(
+        f"Exporting {len(columns)} columns from {len(row_groups)}/{parquet_file.num_row_groups} row groups..."
+    )
+
+    rows_written = 0
+    with OpenSink(csv_path) as sink:
+        writer = pa_csv.CSVWriter(sink, pa.schema([schema.field(c) for c in columns]))
+
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=columns):
+            if start_scalar is not None or end_scalar is not None:
+                timestamps = batch.column(TIME_COLUMN)
+                mask = pa.scalar(True)
+                if start_scalar is not None:
+                    mask = pc.and_(mask, pc.greater_equal(timestamps, start_scalar))
+                if end_scalar is not None:
+                    mask = pc.and_(mask, pc.less_equal(timestamps, end_scalar))
+                batch = batch.filter(mask)
+
+            if drop_empty and batch.num_rows:
+                has_value = pa.scalar(False)
+                for name in columns[1:]:
+                    has_value = pc.or_(has_value, pc.invert(pc.is_null(batch.column(name), nan_is_null=True)))
+                batch = batch.filter(has_value)
+
+            if batch.num_rows:
+                writer.write_batch(batch)
+                rows_written += batch.num_rows
+
+        writer.close()
+
+    return rows_written
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export a converted parquet test to CSV, streaming")
+    ap.add_argument("input_path", help="parquet file to export")
+    ap.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="output CSV; .gz/.bz2/.zst suffixes are compressed on the fly (default: <input name>.csv)",
+    )
+    ap.add_argument("--columns", default=None, help="comma-separated channels to export (default: all)")
+    ap.add_argument("--start", default=None)
+    ap.add_argument("--end", default=None)
+    ap.add_argument(
+        "--keep-empty-rows",
+        action="store_true",
+        help="with --columns, also write rows where every selected column is empty",
+    )
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows decoded and written at a time")
+    args = ap.parse_args()
+
+    input_name = os.path.splitext(os.path.basename(args.input_path))[0]
+    csv_path = args.output or f"{input_name}.csv"
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+
+    t_start = time.perf_counter()
+    rows = ExportParquetToCSV(
+        args.input_path, csv_path, columns, args.start, args.end, args.batch_size, args.keep_empty_rows
+    )
+    elapsed = time.perf_counter() - t_start
+
+    size_mb = os.path.getsize(csv_path) / 1e6
+    print(f"✓ Exported {rows} rows to {csv_path} ({size_mb:.1f} MB) in {elapsed:.2f} s")
+
 
-input = "11-19-2025-hotfire-attempt"
-df = pd.read_parquet(f"data/{input}.parquet")
-df.to_csv(f"{input}.csv", index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
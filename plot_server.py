@@ -0,0 +1,226 @@
+import argparse, io, json, os, socket, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+# The client side of this file only uses the standard library, so a request costs interpreter startup and a socket
+# round trip; pandas/pyarrow/plotly and the sensor config are imported once, by the server.
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"data_plotter-{getattr(os, 'getuid', lambda: 'user')()}.sock")
+DEFAULT_JOBS = 2  # plot jobs run at once; each already spreads its traces over --workers threads
+CONNECT_TIMEOUT_S = 0.5
+
+
+def _Address(socket_path: str | None, port: int | None):
+    if port is not None or not hasattr(socket, "AF_UNIX"):
+        return socket.AF_INET, ("127.0.0.1", port or 8765)
+    return socket.AF_UNIX, socket_path or DEFAULT_SOCKET
+
+
+def _SendLine(conn: socket.socket, message: dict):
+    conn.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+class _ThreadRoutedStream(io.TextIOBase):
+    """Stand-in for sys.stdout/stderr that sends each job thread's prints back to that job's client."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.sinks = {}  # thread id -> callable(text)
+
+    def write(self, text):
+        sink = self.sinks.get(threading.get_ident())
+        if sink is None:
+            return self.fallback.write(text)
+        sink(text)
+        return len(text)
+
+    def flush(self):
+        self.fallback.flush()
+
+
+class PlotServer:
+    """Runs main.py jobs in a warm process: imports, sensor config and recently loaded tests stay in memory."""
+
+    def __init__(self, family, address, jobs: int = DEFAULT_JOBS):
+        import main  # the slow part, paid once
+
+        self.main = main
+        self.family, self.address = family, address
+        self.pool = ThreadPoolExecutor(max_workers=jobs)
+        self.jobs_done = 0
+        self.stopping = threading.Event()
+        self.stdout = _ThreadRoutedStream(sys.stdout)
+        self.stderr = _ThreadRoutedStream(sys.stderr)
+
+    def _Listen(self) -> socket.socket:
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            try:
+                with socket.socket(socket.AF_UNIX) as probe:
+                    probe.connect(self.address)
+                raise SystemExit(f"A plot server is already listening on {self.address}")
+            except ConnectionRefusedError:
+                os.unlink(self.address)  # left behind by a server that did not shut down cleanly
+
+        listener = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(self.address)
+        listener.listen()
+        listener.settimeout(0.5)  # so stop requests are noticed
+        return listener
+
+    def RunJob(self, conn: socket.socket, argv: list) -> int:
+        def send_output(text):
+            if text:
+                _SendLine(conn, {"out": text})
+
+        thread_id = threading.get_ident()
+        self.stdout.sinks[thread_id] = self.stderr.sinks[thread_id] = send_output
+        try:
+            self.main.main(argv)
+            return 0
+        except SystemExit as e:  # argparse errors and the input checks in main()
+            if isinstance(e.code, str):
+                send_output(e.code + "\n")
+                return 1
+            return e.code or 0
+        except Exception as e:
+            send_output(f"Error: {type(e).__name__}: {e}\n")
+            return 1
+        finally:
+            del self.stdout.sinks[thread_id], self.stderr.sinks[thread_id]
+
+    def Status(self) -> dict:
+        with self.main._test_cache_lock:
+            cached = [
+                {"path": key[0], "megabytes": round(nbytes / 1e6, 1)}
+                for key, (_, nbytes) in self.main._test_cache.items()
+            ]
+        return {"pid": os.getpid(), "cwd": os.getcwd(), "jobs_done": self.jobs_done, "cached_tests": cached}
+
+    def Handle(self, conn: socket.socket):
+        with conn:
+            try:
+                request = json.loads(conn.makefile("r", encoding="utf-8").readline())
+                command = request.get("command", "plot")
+
+                if command == "status":
+                    _SendLine(conn, {"status": self.Status(), "exit": 0})
+                elif command == "stop":
+                    self.stopping.set()
+                    _SendLine(conn, {"out": "Plot server stopping\n", "exit": 0})
+                elif request.get("cwd") != os.getcwd():
+                    # Jobs write output/ and read data/ relative to the working directory, which threads share
+                    message = f"Plot server runs in {os.getcwd()}; start one in {request.get('cwd')}\n"
+                    _SendLine(conn, {"out": message, "exit": 2})
+                else:
+                    t_start = time.perf_counter()
+                    code = self.RunJob(conn, request["argv"])
+                    self.jobs_done += 1
+                    _SendLine(conn, {"exit": code, "elapsed_s": round(time.perf_counter() - t_start, 3)})
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client went away; the job's files are still written
+
+    def Serve(self):
+        listener = self._Listen()
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+        where = self.address if self.family == socket.AF_UNIX else "%s:%d" % self.address
+        print(f"✓ Plot server ready on {where} (pid {os.getpid()}, {self.pool._max_workers} jobs at a time)")
+
+        try:
+            while not self.stopping.is_set():
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                self.pool.submit(self.Handle, conn)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            if self.family == socket.AF_UNIX and os.path.exists(self.address):
+                os.unlink(self.address)
+            self.pool.shutdown(wait=True)
+            sys.stdout, sys.stderr = self.stdout.fallback, self.stderr.fallback
+            print("Plot server stopped")
+
+
+def Request(family, address, request: dict) -> dict | None:
+    """Send one request and echo the job's output as it arrives; None if no server is listening."""
+    conn = socket.socket(family, socket.SOCK_STREAM)
+    conn.settimeout(CONNECT_TIMEOUT_S)
+    try:
+        conn.connect(address)
+    except OSError:  # no socket file, nothing listening, or a hung server
+        conn.close()
+        return None
+
+    with conn:
+        conn.settimeout(None)
+        _SendLine(conn, request)
+        for line in conn.makefile("r", encoding="utf-8"):
+            reply = json.loads(line)
+            if "out" in reply:
+                sys.stdout.write(reply["out"])
+                sys.stdout.flush()
+            if "exit" in reply:
+                return reply
+    print("Plot server closed the connection")
+    return {"exit": 1}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Keep main.py warm in a background process and send it plot jobs")
+    ap.add_argument("--socket", default=None, help=f"unix socket to serve on / connect to (default: {DEFAULT_SOCKET})")
+    ap.add_argument("--port", type=int, default=None, help="use TCP on 127.0.0.1 instead of a unix socket")
+    commands = ap.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="start the server in the foreground")
+    serve.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="plot jobs run at once")
+    serve.add_argument("--cache-gb", type=float, default=None, help="memory for recently loaded tests (default 2)")
+
+    plot = commands.add_parser("plot", help="run `main.py ARGS...` on the server (locally if none is running)")
+    commands.add_parser("status", help="show the server's cached tests")
+    commands.add_parser("stop", help="shut the server down after running jobs finish")
+
+    # Everything after `plot` belongs to main.py, including options this parser would reject
+    argv = sys.argv[1:]
+    main_args = argv[argv.index("plot") + 1 :] if "plot" in argv else []
+    args = ap.parse_args(argv[: len(argv) - len(main_args)])
+    family, address = _Address(args.socket, args.port)
+
+    if args.command == "serve":
+        server = PlotServer(family, address, args.jobs)
+        if args.cache_gb is not None:
+            server.main.TEST_CACHE_MAX_BYTES = int(args.cache_gb * 1024**3)
+        server.Serve()
+        return
+
+    if args.command == "plot":
+        request = {"command": "plot", "argv": main_args, "cwd": os.getcwd()}
+    else:
+        request = {"command": args.command}
+
+    t_start = time.perf_counter()
+    reply = Request(family, address, request)
+
+    if reply is None:
+        if args.command != "plot":
+            raise SystemExit("No plot server running")
+        print("No plot server running; plotting in this process")
+        import main as plotter
+
+        plotter.main(main_args)
+        return
+
+    if "status" in reply:
+        print(json.dumps(reply["status"], indent=1))
+    elif args.command == "plot" and reply["exit"]:
+        print(f"Server job failed (exit {reply['exit']})")
+    elif args.command == "plot":
+        print(f"✓ Server job finished in {reply.get('elapsed_s', 0):.2f} s ({time.perf_counter() - t_start:.2f} s round trip)")
+    sys.exit(reply["exit"])
+
+
+if __name__ == "__main__":
+    main()
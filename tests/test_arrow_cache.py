@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import main
+
+
+def _Frame(n_rows: int) -> pd.DataFrame:
+    index = pd.date_range("2025-11-19 20:00", periods=n_rows, freq="1ms", tz="UTC", name="timestamp")
+    rng = np.random.default_rng(0)
+    values = {f"PT-OX-0{i}": rng.normal(size=n_rows) for i in range(4)}
+    values["PT-OX-00"][::7] = np.nan
+    return pd.DataFrame(values, index=index)
+
+
+def test_cached_load_maps_columns_without_copying(tmp_path):
+    df = _Frame(300_050)  # several of the old 64K-row chunks
+    cache_path = str(tmp_path / "test.arrow")
+    main.WriteArrowCache(df, cache_path)
+
+    allocated_before = pa.total_allocated_bytes()
+    loaded = main.ReadArrowCache(cache_path)
+    allocated = pa.total_allocated_bytes() - allocated_before
+
+    assert allocated < 64 * 1024
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+    for column in loaded.columns:
+        # A view of the mapping, not an array numpy owns
+        assert not loaded[column].to_numpy().flags.owndata
+
+
+def test_chunked_cache_is_rebuilt(tmp_path):
+    df = _Frame(100_000)
+    cache_path = str(tmp_path / "test.arrow")
+    table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+    pa.feather.write_feather(table, cache_path, compression="uncompressed", chunksize=65_536)
+
+    assert main.ReadArrowCache(cache_path) is None
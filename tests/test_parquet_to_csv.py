@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from parquet_to_csv_converter import ExportParquetToCSV
+
+
+def _WriteTwoGroupParquet(path):
+    # Two time groups interleaved: each row has values for one group and nulls for the other
+    timestamps = pd.date_range("2025-11-19 20:00", periods=10, freq="1ms", tz="UTC")
+    dev5 = np.where(np.arange(10) % 2 == 0, np.arange(10.0), np.nan)
+    dev6 = np.where(np.arange(10) % 2 == 1, np.arange(10.0), np.nan)
+    table = pa.table({"timestamp": timestamps, "PT-OX-02": pa.array(dev5, from_pandas=True), "FMS": dev6})
+    pq.write_table(table, path)
+
+
+def test_selected_columns_skip_rows_with_no_values(tmp_path):
+    parquet_path, csv_path = str(tmp_path / "test.parquet"), str(tmp_path / "out.csv")
+    _WriteTwoGroupParquet(parquet_path)
+
+    rows = ExportParquetToCSV(parquet_path, csv_path, columns=["PT-OX-02"], batch_size=4)
+
+    exported = pd.read_csv(csv_path)
+    assert rows == 5
+    assert exported["PT-OX-02"].notna().all()
+
+
+def test_keep_empty_rows_writes_every_row(tmp_path):
+    parquet_path, csv_path = str(tmp_path / "test.parquet"), str(tmp_path / "out.csv")
+    _WriteTwoGroupParquet(parquet_path)
+
+    rows = ExportParquetToCSV(parquet_path, csv_path, columns=["PT-OX-02"], keep_empty_rows=True)
+
+    assert rows == 10
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+import main
+
+
+def _SpikeFlags(values: np.ndarray, column: str = "PT-CHAMBER") -> list:
+    index = pd.date_range("2025-11-19 20:00", periods=len(values), freq="1ms", tz="UTC", name="timestamp")
+    summaries = {column: {}}
+    flags = main.ScanQuality(pd.DataFrame({column: values}, index=index), None, summaries)
+    return [flag for flag in flags if flag["kind"] == "spike"]
+
+
+def _Burn(n: int = 60_000) -> np.ndarray:
+    # Quiet chamber, then a 10 s burn with combustion oscillation of a few psi at 180-470 Hz
+    rng = np.random.default_rng(1)
+    t = np.arange(n) / 1000.0
+    values = 14.7 + rng.normal(0, 0.05, n)
+    burn = (t >= 20) & (t < 30)
+    values[burn] += 300 + 8 * np.sin(2 * np.pi * 470 * t[burn]) + 5 * np.sin(2 * np.pi * 180 * t[burn])
+    return values
+
+
+def test_oscillating_channel_has_no_spike_flags():
+    assert _SpikeFlags(_Burn()) == []
+
+
+def test_isolated_excursions_are_flagged():
+    values = _Burn()
+    values[5_000] += 40  # one-sample spike while quiet
+    values[40_000:40_002] -= 30  # two-sample dropout spike after the burn
+    values[25_000] += 200  # one-sample spike in the middle of the oscillation
+
+    flags = _SpikeFlags(values)
+
+    assert [flag["samples"] for flag in flags] == [1, 1, 2]
+    assert [pd.Timestamp(flag["start"]) for flag in flags] == [
+        pd.Timestamp("2025-11-19 20:00", tz="UTC") + pd.Timedelta(milliseconds=ms) for ms in (5_000, 25_000, 40_000)
+    ]
+
+
+def test_step_change_is_not_a_spike():
+    values = np.r_[np.full(5_000, 14.7), np.full(5_000, 300.0)] + np.random.default_rng(2).normal(0, 0.05, 10_000)
+    assert _SpikeFlags(values) == []
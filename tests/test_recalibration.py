@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import main
+
+OLD = {"PT-OX-02": {"scale": 2.0, "unit": "psi"}, "FMS": {"scale": 10.0}}
+
+
+def _WriteCalibratedTest(path: str):
+    """A converted test calibrated with OLD; FMS lost its raw column along the way."""
+    index = pd.date_range("2025-11-19 20:00", periods=2_000, freq="1ms", tz="UTC", name="timestamp")
+    raw = 100 + np.random.default_rng(0).normal(0, 0.1, len(index))
+    raw[1_000] += 50  # one spike, in raw units
+    df = pd.DataFrame({"PT-OX-02": raw * 2.0, "PT-OX-02_raw": raw, "FMS": np.linspace(0, 100, len(index))}, index=index)
+
+    tag = {"version": 1, "channels": {c: main.CalibrationHash(spec) for c, spec in OLD.items()}}
+    table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+    table = table.replace_schema_metadata({main.CALIBRATION_KEY: json.dumps(tag).encode()})
+    pq.write_table(table, path)
+
+    summaries = main.SummarizeTimeGroup(df[["PT-OX-02", "FMS"]], "Dev5_BCLS_ai_time")
+    quality = main.ScanQuality(df[["PT-OX-02", "FMS"]], "Dev5_BCLS_ai_time", summaries)
+    main.WriteSummary(path, summaries, path, len(df), quality)
+
+
+def test_recalibration_refreshes_summary_and_skips_channels_without_raw(tmp_path):
+    path = str(tmp_path / "test.parquet")
+    _WriteCalibratedTest(path)
+
+    # PT-OX-02 changes scale; FMS is dropped from the table but has no raw column to fall back to
+    recomputed = main.RecalibrateParquet(path, {"version": 2, "channels": {"PT-OX-02": {"scale": 3.0}}})
+
+    assert recomputed == ["PT-OX-02"]
+    df = pd.read_parquet(path)
+    np.testing.assert_allclose(df["PT-OX-02"], df["PT-OX-02_raw"] * 3.0)
+    np.testing.assert_allclose(df["FMS"], np.linspace(0, 100, len(df)))
+    assert main.StoredCalibration(pq.read_schema(path))["channels"]["FMS"] == main.CalibrationHash(OLD["FMS"])
+
+    summary = main.LoadSummary(path)
+    entry = summary["channels"]["PT-OX-02"]
+    assert entry["max"] == df["PT-OX-02"].max()
+    assert "unit" not in entry
+    spikes = [flag for flag in summary["quality"] if flag["kind"] == "spike"]
+    assert [flag["channel"] for flag in spikes] == ["PT-OX-02"]
+
+
+def test_calibrated_channels_are_range_checked_in_raw_units_and_labelled_in_their_own(tmp_path):
+    path = str(tmp_path / "test.parquet")
+    index = pd.date_range("2025-11-19 20:00", periods=2_000, freq="1ms", tz="UTC", name="timestamp")
+    volts = 1.0 + np.random.default_rng(0).normal(0, 0.01, len(index))
+    pq.write_table(pa.Table.from_pandas(pd.DataFrame({"RTD-OX": volts}, index=index).reset_index()), path)
+    summaries = main.SummarizeTimeGroup(pd.DataFrame({"RTD-OX": volts}, index=index), "Dev5_BCLS_ai_time")
+    main.WriteSummary(path, summaries, path, len(index), [])
+
+    main.RecalibrateParquet(path, {"version": 1, "channels": {"RTD-OX": {"poly": [30, 250], "unit": "K"}}})
+
+    summary = main.LoadSummary(path)
+    assert summary["channels"]["RTD-OX"]["min"] > 200  # kelvin, far outside the (-10, 10) V range
+    assert summary["quality"] == []
+
+    df = pd.read_parquet(path).set_index("timestamp")
+    sensors = [{"column": "RTD-OX", "name": "RTD-OX", "color": "#fff", "yaxis": "y4"}]
+    figure = main.FigureFromFrame(df, "test", summary=summary, sensors=sensors)
+    assert figure.layout.yaxis4.title.text == "RTD [K]"
+    assert figure.data[0].hovertemplate.endswith("[K]")
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+
+def test_resample_keeps_states_binary_and_averages_analog():
+    index = pd.date_range("2025-11-19 20:00", periods=20, freq="400us", tz="UTC", name="timestamp")
+    # The valve opens in the middle of the third 1 ms bin
+    state = np.r_[np.zeros(6), np.ones(14)]
+    df = pd.DataFrame({"SV-OX-01": state, "PT-OX-02": np.arange(20.0)}, index=index)
+
+    resampled = main.ResampleToGrid(df, pd.Timedelta("1ms"))
+
+    assert set(np.unique(resampled["SV-OX-01"])) == {0.0, 1.0}
+    assert resampled["SV-OX-01"].iloc[2] == 1.0  # last sample of the bin, not the 2/3 a mean would give
+    assert resampled["PT-OX-02"].iloc[0] == np.mean([0.0, 1.0, 2.0])
+
+
+def test_align_nearest_accepts_groups_of_different_time_units():
+    dev5 = pd.date_range("2025-11-19 20:00", periods=10, freq="1ms", tz="UTC", name="timestamp").as_unit("us")
+    # A clock offset added with pd.to_timedelta leaves the shifted group in ns
+    dev6 = dev5.as_unit("ns") + pd.to_timedelta(-0.0003, unit="s")
+    frames = {
+        main.DEV5_TIME: pd.DataFrame({"PT-OX-02": np.arange(10.0)}, index=dev5),
+        main.DEV6_TIME: pd.DataFrame({"PT-CHAMBER": np.arange(10.0) + 100}, index=dev6),
+    }
+
+    aligned = main.AlignNearest(frames, pd.Timedelta("1ms"))
+
+    np.testing.assert_array_equal(aligned["PT-CHAMBER"], np.arange(10.0) + 100)
+
+
+def test_malformed_clock_offsets_are_rejected(capsys):
+    for clock_offset in ("Dev6", "Dev6_BCLS_ai_time=", "=0.1", "Dev6_BCLS_ai_time=abc"):
+        with pytest.raises(SystemExit) as exit_info:
+            main.main(["data/missing.csv", "--clock-offset", clock_offset])
+        assert exit_info.value.code == 2
+        assert "--clock-offset expects TIME_COLUMN=SECONDS" in capsys.readouterr().err
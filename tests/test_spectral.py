@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+import main
+
+
+def _WriteTest(path: str, n: int, period: str, tone_hz: float) -> pd.DataFrame:
+    index = pd.date_range("2025-11-19 20:00", periods=n, freq=period, tz="UTC", name="timestamp")
+    t = (index - index[0]).total_seconds().to_numpy()
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"PT-CHAMBER": 300 + 5 * np.sin(2 * np.pi * tone_hz * t) + rng.normal(0, 0.1, n)}, index=index)
+    df.reset_index().to_parquet(path)
+    return df
+
+
+def _Spectra(monkeypatch, path, df, start=None, end=None) -> dict:
+    captured = {}
+    monkeypatch.setattr(main, "SpectralFigure", lambda spectra, title: captured.update(spectra) or main.go.Figure())
+    if start or end:
+        df = df.loc[start:end]
+    main.WriteSpectralPage(path, path.replace(".parquet", ".html"), df, start, end)
+    return captured
+
+
+def test_spectra_use_the_stored_sample_rate(tmp_path, monkeypatch):
+    # A 4 ms resampled test: the summary would still say 1 kHz, the file holds 250 Hz
+    path = str(tmp_path / "test.parquet")
+    df = _WriteTest(path, 20_000, "4ms", 120.0)
+
+    freqs, psd, _, _ = _Spectra(monkeypatch, path, df)["PT-CHAMBER"]
+
+    assert abs(freqs[np.argmax(psd[1:]) + 1] - 120.0) < 0.1
+
+
+def test_windowed_spectrogram_columns_follow_the_window(tmp_path, monkeypatch):
+    path = str(tmp_path / "test.parquet")
+    df = _WriteTest(path, 1_000_000, "1ms", 50.0)
+    start, end = "2025-11-19 20:01", "2025-11-19 20:02"
+
+    _, _, times, spectrogram = _Spectra(monkeypatch, path, df, start, end)["PT-CHAMBER"]
+
+    segments = (60_001 - main.SPECTRAL_NPERSEG) // (main.SPECTRAL_NPERSEG // 2) + 1
+    assert spectrogram.shape[1] == segments  # one segment per column; sized from the test it would be every 2-3
@@ -0,0 +1,66 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+import main
+
+
+def _Frame() -> pd.DataFrame:
+    index = pd.date_range("2025-11-19 20:00", periods=50_000, freq="1ms", tz="UTC", name="timestamp")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "PT-OX-02": np.cumsum(rng.normal(size=len(index))),
+            "FMS": rng.normal(size=len(index)),
+            "PI-OX-02": (np.arange(len(index)) // 7_000 % 2).astype(np.float64),
+        },
+        index=index,
+    )
+
+
+SENSORS = [
+    {"column": "PT-OX-02", "name": "PT-OX-02", "color": "#4199E1", "yaxis": "y1"},
+    {"column": "FMS", "name": "FMS", "color": "#C9B400", "yaxis": "y5"},
+    {"column": "PI-OX-02", "name": "PI-OX-02", "color": "#9a28b3", "yaxis": "y2"},
+]
+
+
+def test_point_budget_classifies_each_channel_once(monkeypatch):
+    calls = []
+    classify = main.IsDigitalChannel
+    monkeypatch.setattr(main, "IsDigitalChannel", lambda name, *args: calls.append(name) or classify(name, *args))
+
+    traces = main.BuildTraces(_Frame(), SENSORS, None, workers=2, point_budget=10_000)
+
+    assert sorted(calls) == sorted(sensor["column"] for sensor in SENSORS)
+    assert [trace["name"] for trace in traces] == ["PT-OX-02", "FMS", "PI-OX-02"]
+    assert traces[2]["line"]["shape"] == "hv"
+
+
+def test_point_budget_holds_one_sensors_samples_at_a_time(monkeypatch):
+    alive, most_alive = [], []
+    extract = main.SensorSamples
+
+    def tracked(*args):
+        samples = extract(*args)
+        alive[:] = [ref for ref in alive if ref() is not None]
+        most_alive.append(len(alive))
+        alive.append(weakref.ref(samples["y"]))
+        return samples
+
+    monkeypatch.setattr(main, "SensorSamples", tracked)
+
+    main.BuildTraces(_Frame(), SENSORS, None, workers=1, point_budget=10_000)
+
+    assert max(most_alive) == 0  # with one worker, each channel's arrays are gone before the next is extracted
+
+
+def test_filters_only_when_configured():
+    df = _Frame()
+    plain = main.BuildTraces(df, SENSORS, None)
+    filtered_fms = dict(SENSORS[1], filters=[{"kind": "lowpass", "cutoff_hz": 20}])
+    filtered = main.BuildTraces(df, [SENSORS[0], filtered_fms, SENSORS[2]], None)
+
+    assert len(plain) == 3
+    assert [trace["name"] for trace in filtered] == ["PT-OX-02", "FMS", "FMS (low-pass 20 Hz)", "PI-OX-02"]
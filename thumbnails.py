@@ -0,0 +1,135 @@
+import argparse, os, time
+
+import numpy as np
+import pyarrow.parquet as pq
+
+TIME_COLUMN = "timestamp"
+
+# Key channels drawn in each thumbnail, with their line colors; missing ones are skipped
+THUMBNAIL_CHANNELS = {
+    "PT-CHAMBER": "#000000",
+    "PT-OX-201": "#2C6CCC",
+    "PT-FU-201": "#D42828",
+    "PT-OX-02": "#4199E1",
+    "PT-FU-02": "#C77047",
+    "FMS": "#C9B400",
+}
+THUMBNAIL_WIDTH = 240
+THUMBNAIL_HEIGHT = 48
+
+# Finest pyramid level, in time buckets; coarser levels halve it until the thumbnail width is reached
+PYRAMID_BASE_BUCKETS = 4096
+
+
+def MinMaxPyramid(times_ns: np.ndarray, values: np.ndarray, t_start: int, t_end: int, base_buckets: int):
+    """Min/max envelopes of a channel over equal time buckets, finest level first, halving each level.
+
+    Empty buckets are NaN. times_ns must be sorted.
+    """
+    valid = ~np.isnan(values)
+    times_ns, values = times_ns[valid], values[valid]
+
+    mins = np.full(base_buckets, np.nan)
+    maxs = np.full(base_buckets, np.nan)
+    if len(values):
+        span = max(t_end - t_start, 1)
+        buckets = np.minimum((times_ns - t_start) * base_buckets // span, base_buckets - 1)
+        # Sorted times give sorted buckets, so each bucket is one contiguous reduceat segment
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        mins[buckets[starts]] = np.minimum.reduceat(values, starts)
+        maxs[buckets[starts]] = np.maximum.reduceat(values, starts)
+
+    levels = [(mins, maxs)]
+    while len(mins) > 1:
+        if len(mins) % 2:
+            mins, maxs = np.append(mins, np.nan), np.append(maxs, np.nan)
+        pair_mins, pair_maxs = mins.reshape(-1, 2), maxs.reshape(-1, 2)
+        # fmin/fmax ignore a NaN partner, so a bucket is only empty when both halves are
+        mins = np.fmin(pair_mins[:, 0], pair_mins[:, 1])
+        maxs = np.fmax(pair_maxs[:, 0], pair_maxs[:, 1])
+        levels.append((mins, maxs))
+
+    return levels
+
+
+def _EnvelopePath(mins: np.ndarray, maxs: np.ndarray, low: float, high: float, width: int, height: int) -> str:
+    """SVG polygon points for the min/max band (upper edge left→right, lower edge right→left)."""
+    keep = ~np.isnan(mins)
+    xs = (np.arange(len(mins)) + 0.5) * width / len(mins)
+    scale = (height - 2) / (high - low) if high > low else 0.0
+
+    upper_y = height - 1 - (maxs - low) * scale
+    lower_y = height - 1 - (mins - low) * scale
+    upper = [f"{x:.1f},{y:.1f}" for x, y in zip(xs[keep], upper_y[keep])]
+    lower = [f"{x:.1f},{y:.1f}" for x, y in zip(xs[keep][::-1], lower_y[keep][::-1])]
+    return " ".join(upper + lower)
+
+
+def ThumbnailSvg(parquet_path: str, width: int = THUMBNAIL_WIDTH, height: int = THUMBNAIL_HEIGHT) -> str | None:
+    """Small SVG sparkline of the key channels of a converted test; None if it has none of them."""
+    parquet_file = pq.ParquetFile(parquet_path)
+    channels = [c for c in THUMBNAIL_CHANNELS if c in parquet_file.schema_arrow.names]
+    if not channels:
+        return None
+
+    table = parquet_file.read(columns=[TIME_COLUMN] + channels)
+    times_ns = table.column(TIME_COLUMN).cast("int64").to_numpy()
+    if len(times_ns) == 0:
+        return None
+    order = None if np.all(times_ns[1:] >= times_ns[:-1]) else np.argsort(times_ns, kind="stable")
+    if order is not None:
+        times_ns = times_ns[order]
+    t_start, t_end = int(times_ns[0]), int(times_ns[-1])
+
+    shapes = []
+    for channel in channels:
+        values = table.column(channel).to_numpy(zero_copy_only=False).astype(np.float64)
+        if order is not None:
+            values = values[order]
+
+        levels = MinMaxPyramid(times_ns, values, t_start, t_end, PYRAMID_BASE_BUCKETS)
+        # Coarsest level that still has at least one bucket per pixel column
+        mins, maxs = next((level for level in reversed(levels) if len(level[0]) >= width), levels[0])
+        if np.isnan(mins).all():
+            continue
+
+        points = _EnvelopePath(mins, maxs, np.nanmin(mins), np.nanmax(maxs), width, height)
+        color = THUMBNAIL_CHANNELS[channel]
+        shapes.append(
+            f'<polygon points="{points}" fill="{color}" fill-opacity="0.35" stroke="{color}" '
+            f'stroke-width="0.6"><title>{channel}</title></polygon>'
+        )
+
+    if not shapes:
+        return None
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">{"".join(shapes)}</svg>'
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Render SVG sparkline thumbnails of converted tests")
+    ap.add_argument("inputs", nargs="+", help="parquet files")
+    ap.add_argument("--out-dir", default=os.path.join("output", "thumbnails"))
+    args = ap.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    t_start = time.perf_counter()
+
+    for parquet_path in args.inputs:
+        svg = ThumbnailSvg(parquet_path)
+        if svg is None:
+            print(f"Skipping {parquet_path}: none of {list(THUMBNAIL_CHANNELS)} present")
+            continue
+        svg_path = os.path.join(args.out_dir, f"{os.path.splitext(os.path.basename(parquet_path))[0]}.svg")
+        with open(svg_path, "w", encoding="utf-8") as f:
+            f.write(svg)
+        print(f"  Saved {svg_path}")
+
+    print(f"✓ Rendered {len(args.inputs)} thumbnails in {time.perf_counter() - t_start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()